@@ -195,7 +195,7 @@ async def process_query(request: QueryRequest):
                 "estimated_latency_ms": routing_decision.estimated_latency_ms,
                 "estimated_cost": routing_decision.estimated_cost,
                 "fallback_chain": [m.value for m in routing_decision.fallback_chain],
-                "reasoning": routing_decision.reasoning
+                "reasoning": routing_decision.build_reasoning()
             },
             confidence=routing_decision.confidence,
             latency_ms=(datetime.now() - start_time).total_seconds() * 1000,
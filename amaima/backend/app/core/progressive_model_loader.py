@@ -4,16 +4,32 @@ Dynamic model loading with memory optimization and quantization
 """
 
 from enum import Enum
+from collections import defaultdict
 from dataclasses import dataclass, field
-from typing import Optional, Dict, List, Tuple, Any, Callable
+from typing import Optional, Dict, List, Tuple, Any, Callable, FrozenSet, Set
 from datetime import datetime
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import hashlib
+import heapq
+import json
 import logging
 import os
+import queue
+import re
 
 logger = logging.getLogger(__name__)
 
+_WORD_PATTERN = re.compile(r"[a-z]+")
+
+# TensorRT builder flags per precision; INT8 keeps FP16 as a fallback for layers that calibrate poorly
+_PRECISION_FLAGS: Dict[str, Tuple[str, ...]] = {
+    "int8": ("INT8", "FP16"),
+    "fp16": ("FP16",),
+    "bf16": ("BF16",),
+}
+
 
 class ModuleType(Enum):
     """AI module categories"""
@@ -36,8 +52,18 @@ class ModuleStatus(Enum):
     ERROR = "error"
 
 
-@dataclass
-class ModuleSpec:
+def _monotonic_to_iso(timestamp: float) -> str:
+    """Convert a time.monotonic() reading to a wall-clock ISO timestamp"""
+    return datetime.fromtimestamp(time.time() - (time.monotonic() - timestamp)).isoformat()
+
+
+class _StaticDictSlot:
+    """Slot for ModuleSpec's serialized registration fields, kept out of its dataclass fields"""
+    __slots__ = ("_static_dict",)
+
+
+@dataclass(slots=True)
+class ModuleSpec(_StaticDictSlot):
     """Module specification and metadata"""
     name: str
     module_type: ModuleType
@@ -51,27 +77,36 @@ class ModuleSpec:
     model_path: str
     tokenizer_path: Optional[str]
     usage_count: int = 0
-    last_used: Optional[datetime] = None
+    last_used: float = 0.0  # time.monotonic() of last use, 0.0 if never used
     
     def to_dict(self) -> Dict:
+        # Registration-time fields never change, so serialize them once. Built
+        # here rather than in __post_init__ because copies and unpickled specs
+        # only restore the dataclass fields
+        try:
+            static = self._static_dict
+        except AttributeError:
+            static = self._static_dict = {
+                "name": self.name,
+                "module_type": self.module_type.value,
+                "version": self.version,
+                "priority": self.priority,
+                "size_mb": self.size_mb,
+                "dependencies": self.dependencies,
+                "capabilities": self.capabilities,
+                "memory_requirement_mb": self.memory_requirement_mb,
+                "quantization_supported": self.quantization_supported,
+                "model_path": self.model_path,
+                "tokenizer_path": self.tokenizer_path,
+            }
         return {
-            "name": self.name,
-            "module_type": self.module_type.value,
-            "version": self.version,
-            "priority": self.priority,
-            "size_mb": self.size_mb,
-            "dependencies": self.dependencies,
-            "capabilities": self.capabilities,
-            "memory_requirement_mb": self.memory_requirement_mb,
-            "quantization_supported": self.quantization_supported,
-            "model_path": self.model_path,
-            "tokenizer_path": self.tokenizer_path,
+            **static,
             "usage_count": self.usage_count,
-            "last_used": self.last_used.isoformat() if self.last_used else None
+            "last_used": _monotonic_to_iso(self.last_used) if self.last_used else None
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class LoadedModule:
     """Runtime state of a loaded module"""
     spec: ModuleSpec
@@ -85,9 +120,26 @@ class LoadedModule:
 class TensorRTQuantizer:
     """TensorRT quantization for model optimization"""
     
-    def __init__(self, enabled: bool = True):
+    def __init__(self, enabled: bool = True, max_sequence_length: int = 512,
+                 cache_file: Optional[str] = None):
         self.enabled = enabled
-        self.quantization_cache: Dict[str, str] = {}
+        self.max_sequence_length = max_sequence_length
+        self.cache_file = cache_file or os.path.expanduser("~/.amaima/trt_cache.json")
+        # Engine paths by (model_path, precision, engine_key); engine_key covers
+        # everything the engine depends on, see quantize_model
+        self.quantization_cache: Dict[Tuple[str, str, str], str] = {}
+        self._fingerprints: Dict[str, Tuple[float, int, str]] = {}
+        # TensorRT builder flags by precision, resolved on first use
+        self._builder_flags: Dict[str, Tuple[Any, ...]] = {}
+        self._engine_env: Optional[Tuple[str, str]] = None
+        self._other_env_entries: List[Dict[str, str]] = []
+        self._cache_lock = threading.Lock()
+        self._trt_logger = None
+        self._trt_builder = None
+        self._build_lock = threading.Lock()
+        
+        if enabled:
+            self._load_persistent_cache()
         
     def supports_quantization(self, model_path: str) -> bool:
         """Check if model supports TensorRT quantization"""
@@ -103,7 +155,8 @@ class TensorRTQuantizer:
             return False
     
     def quantize_model(self, model_path: str, precision: str = "int8",
-                       max_batch_size: int = 32) -> Tuple[str, float]:
+                       max_batch_size: int = 32,
+                       calibration_data: Optional[List[Dict[str, Any]]] = None) -> Tuple[str, float]:
         """
         Quantize model to specified precision
         
@@ -111,6 +164,8 @@ class TensorRTQuantizer:
             model_path: Path to original model
             precision: quantization precision (int8, fp16, bf16)
             max_batch_size: Maximum batch size for optimization
+            calibration_data: INT8 calibration batches mapping input name to array;
+                only needed until a calibration cache exists for the model
             
         Returns:
             Tuple of (quantized_model_path, size_reduction_percent)
@@ -118,42 +173,53 @@ class TensorRTQuantizer:
         if not self.supports_quantization(model_path):
             return model_path, 0.0
         
-        cache_key = f"{model_path}:{precision}"
-        if cache_key in self.quantization_cache:
-            return self.quantization_cache[cache_key], 0.0
-        
         try:
             import tensorrt as trt
             from polygraphy import util
             from polygraphy.backend.trt import EngineFromBytes, CreateConfig, Profile
-            import onnx
-            from onnx import optimizer
-            
-            logger.info(f"Quantizing model to {precision}: {model_path}")
             
             onnx_path = model_path.replace(".pt", ".onnx")
             if not os.path.exists(onnx_path):
-                self._convert_to_onnx(model_path, onnx_path)
+                self._convert_to_onnx(model_path, onnx_path, max_batch_size)
             
-            optimized_onnx = self._optimize_onnx(onnx_path)
+            # The ONNX contents, the optimization profile bounds and the build
+            # environment all shape the engine, so all of them are in its key
+            trt_version, gpu_arch = self._get_engine_env()
+            engine_key = (
+                f"{self._file_fingerprint(onnx_path)}_b{max_batch_size}"
+                f"_s{self.max_sequence_length}_trt{trt_version}_{gpu_arch}"
+            )
+            cache_key = (model_path, precision, engine_key)
+            cached_path = self.quantization_cache.get(cache_key)
+            if cached_path is not None:
+                return cached_path, 0.0
             
-            quantized_path = model_path.replace(".pt", f"_{precision}.engine")
+            logger.info(f"Quantizing model to {precision}: {model_path}")
+            quantized_path = f"{os.path.splitext(model_path)[0]}_{precision}.{engine_key}.engine"
             
-            if precision == "int8":
-                precision_mode = trt.Int8Builder.FULL_CALIBRATION
-            elif precision == "fp16":
-                precision_mode = trt.BuilderFlag.FP16
-            else:
-                precision_mode = trt.BuilderFlag.BF16
+            try:
+                engine_bytes = os.stat(quantized_path).st_size
+            except FileNotFoundError:
+                engine_bytes = None
             
-            logger.info(f"TensorRT engine built: {quantized_path}")
+            if engine_bytes is not None:
+                logger.info(f"Reusing cached TensorRT engine: {quantized_path}")
+                self._remember_engine(cache_key, quantized_path)
+                return quantized_path, self._size_reduction(model_path, engine_bytes)
             
-            original_size = os.path.getsize(model_path) / (1024 * 1024)
-            quantized_size = os.path.getsize(quantized_path) / (1024 * 1024) if os.path.exists(quantized_path) else original_size
+            optimized_onnx = self._optimize_onnx(onnx_path)
+            serialized_engine = self._build_engine(
+                trt, optimized_onnx, model_path, precision, max_batch_size, calibration_data
+            )
             
-            reduction = ((original_size - quantized_size) / original_size) * 100
+            with open(quantized_path, "wb") as f:
+                f.write(serialized_engine)
+            
+            logger.info(f"TensorRT engine built: {quantized_path}")
             
-            self.quantization_cache[cache_key] = quantized_path
+            reduction = self._size_reduction(model_path, serialized_engine.nbytes)
+            
+            self._remember_engine(cache_key, quantized_path)
             
             return quantized_path, reduction
             
@@ -161,10 +227,180 @@ class TensorRTQuantizer:
             logger.error(f"Quantization failed: {e}")
             return model_path, 0.0
     
-    def _convert_to_onnx(self, model_path: str, onnx_path: str):
-        """Convert PyTorch model to ONNX format"""
+    def _build_engine(self, trt, optimized_onnx: str, model_path: str, precision: str,
+                      max_batch_size: int, calibration_data: Optional[List[Dict[str, Any]]]):
+        """
+        Build a serialized TensorRT engine from an ONNX graph
+        
+        Builds share one trt.Builder (and its CUDA context) and run one at a time.
+        
+        Returns:
+            Serialized engine buffer
+        """
+        with self._build_lock:
+            if self._trt_builder is None:
+                self._trt_logger = trt.Logger(trt.Logger.WARNING)
+                self._trt_builder = trt.Builder(self._trt_logger)
+            trt_logger = self._trt_logger
+            builder = self._trt_builder
+            
+            network = builder.create_network(1 << int(trt.NetworkDefinitionCreationFlag.EXPLICIT_BATCH))
+            parser = trt.OnnxParser(network, trt_logger)
+            
+            with open(optimized_onnx, "rb") as f:
+                if not parser.parse(f.read()):
+                    errors = [str(parser.get_error(i)) for i in range(parser.num_errors)]
+                    raise RuntimeError(f"ONNX parsing failed: {errors}")
+            
+            # One engine serves every batch/sequence size up to the exported bounds
+            profile = builder.create_optimization_profile()
+            for i in range(network.num_inputs):
+                profile.set_shape(
+                    network.get_input(i).name,
+                    min=(1, 1),
+                    opt=(min(8, max_batch_size), min(128, self.max_sequence_length)),
+                    max=(max_batch_size, self.max_sequence_length)
+                )
+            
+            config = builder.create_builder_config()
+            config.add_optimization_profile(profile)
+            for flag in self._get_builder_flags(trt, precision):
+                config.set_flag(flag)
+            if precision == "int8":
+                config.int8_calibrator = _create_entropy_calibrator(
+                    f"{os.path.splitext(model_path)[0]}.calib", calibration_data
+                )
+                config.set_calibration_profile(profile)
+            
+            serialized_engine = builder.build_serialized_network(network, config)
+            if serialized_engine is None:
+                raise RuntimeError(f"TensorRT engine build failed for {optimized_onnx}")
+            
+            return serialized_engine
+    
+    def _get_engine_env(self) -> Tuple[str, str]:
+        """TensorRT version and GPU architecture that built engines are tied to"""
+        if self._engine_env is None:
+            import tensorrt as trt
+            
+            try:
+                import torch
+                major, minor = torch.cuda.get_device_capability()
+                gpu_arch = f"sm{major}{minor}"
+            except Exception:
+                gpu_arch = "unknown"
+            
+            self._engine_env = (trt.__version__, gpu_arch)
+        return self._engine_env
+    
+    def _load_persistent_cache(self):
+        """Restore engines built by earlier processes for the current TensorRT/GPU pair"""
+        if not os.path.exists(self.cache_file):
+            return
+        
+        try:
+            trt_version, gpu_arch = self._get_engine_env()
+            with open(self.cache_file) as f:
+                entries = json.load(f)
+        except ImportError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable quantization cache {self.cache_file}: {e}")
+            return
+        
+        for entry in entries:
+            if entry.get("trt_version") != trt_version or entry.get("gpu_arch") != gpu_arch:
+                self._other_env_entries.append(entry)
+            elif "engine_key" in entry and os.path.exists(entry.get("engine_path", "")):
+                cache_key = (entry["model_path"], entry["precision"], entry["engine_key"])
+                self.quantization_cache[cache_key] = entry["engine_path"]
+        
+        logger.info(f"Loaded {len(self.quantization_cache)} cached TensorRT engines from {self.cache_file}")
+    
+    def _remember_engine(self, cache_key: Tuple[str, str, str], engine_path: str):
+        """Record an engine in memory and atomically rewrite the on-disk cache"""
+        trt_version, gpu_arch = self._get_engine_env()
+        
+        with self._cache_lock:
+            self.quantization_cache[cache_key] = engine_path
+            entries = self._other_env_entries + [
+                {
+                    "model_path": model_path,
+                    "precision": precision,
+                    "engine_key": engine_key,
+                    "trt_version": trt_version,
+                    "gpu_arch": gpu_arch,
+                    "engine_path": path
+                }
+                for (model_path, precision, engine_key), path in self.quantization_cache.items()
+            ]
+            
+            try:
+                os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+                tmp_path = f"{self.cache_file}.tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(entries, f)
+                os.replace(tmp_path, self.cache_file)
+            except OSError as e:
+                logger.warning(f"Failed to persist quantization cache: {e}")
+    
+    def _get_builder_flags(self, trt, precision: str) -> Tuple[Any, ...]:
+        """
+        Resolve the TensorRT builder flags for a precision
+        
+        Only the requested precision is resolved, so a flag missing from the
+        installed TensorRT (BF16 before 9.0) fails that precision alone.
+        """
+        flags = self._builder_flags.get(precision)
+        if flags is None:
+            if precision not in _PRECISION_FLAGS:
+                raise ValueError(f"Unsupported precision: {precision}")
+            try:
+                flags = tuple(getattr(trt.BuilderFlag, flag) for flag in _PRECISION_FLAGS[precision])
+            except AttributeError:
+                raise ValueError(
+                    f"Precision {precision} is not supported by TensorRT {trt.__version__}"
+                ) from None
+            self._builder_flags[precision] = flags
+        return flags
+    
+    def _size_reduction(self, model_path: str, quantized_bytes: int) -> float:
+        """Percentage size reduction of a quantized artifact of the given byte size"""
+        original_bytes = os.stat(model_path).st_size
+        if original_bytes == 0:
+            return 0.0
+        
+        return ((original_bytes - quantized_bytes) / original_bytes) * 100
+    
+    def _file_fingerprint(self, path: str) -> str:
+        """
+        Content hash of a file, recomputed only when its mtime or size changes
+        
+        Args:
+            path: File to fingerprint
+            
+        Returns:
+            Short hex digest identifying the file contents
+        """
+        stat = os.stat(path)
+        cached = self._fingerprints.get(path)
+        if cached and cached[0] == stat.st_mtime and cached[1] == stat.st_size:
+            return cached[2]
+        
+        digest = hashlib.blake2b(digest_size=8)
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        fingerprint = digest.hexdigest()
+        
+        self._fingerprints[path] = (stat.st_mtime, stat.st_size, fingerprint)
+        return fingerprint
+    
+    def _convert_to_onnx(self, model_path: str, onnx_path: str, max_batch_size: int = 32):
+        """Convert PyTorch model to ONNX format with dynamic batch and sequence dimensions"""
         try:
             import torch
+            from torch.export import Dim
             from transformers import AutoModelForCausalLM, AutoTokenizer
             
             logger.info(f"Converting to ONNX: {model_path}")
@@ -172,20 +408,27 @@ class TensorRTQuantizer:
             model = AutoModelForCausalLM.from_pretrained(model_path)
             tokenizer = AutoTokenizer.from_pretrained(model_path)
             
+            # torch.export specializes dimensions whose example size is 1, so the
+            # example batch holds two copies to keep the batch dimension dynamic
             dummy_input = tokenizer("sample input", return_tensors="pt")
+            input_ids = dummy_input["input_ids"].repeat(2, 1)
+            attention_mask = dummy_input["attention_mask"].repeat(2, 1)
+            
+            batch = Dim("batch_size", min=1, max=max_batch_size)
+            sequence = Dim("sequence", min=1, max=self.max_sequence_length)
             
             torch.onnx.export(
                 model,
-                (dummy_input["input_ids"], dummy_input["attention_mask"]),
+                (input_ids, attention_mask),
                 onnx_path,
                 input_names=["input_ids", "attention_mask"],
                 output_names=["logits"],
-                dynamic_axes={
-                    "input_ids": {0: "batch_size", 1: "sequence"},
-                    "attention_mask": {0: "batch_size", 1: "sequence"},
-                    "logits": {0: "batch_size", 1: "sequence"}
+                dynamo=True,
+                dynamic_shapes={
+                    "input_ids": {0: batch, 1: sequence},
+                    "attention_mask": {0: batch, 1: sequence}
                 },
-                opset_version=14
+                opset_version=18
             )
             
             logger.info(f"ONNX conversion complete: {onnx_path}")
@@ -195,25 +438,30 @@ class TensorRTQuantizer:
             raise
     
     def _optimize_onnx(self, onnx_path: str) -> str:
-        """Apply ONNX optimizations"""
+        """Apply ONNX optimizations, reusing a previous result for unchanged inputs"""
         try:
-            import onnx
-            from onnx import optimizer
+            optimized_path = onnx_path.replace(".onnx", f".{self._file_fingerprint(onnx_path)}.opt.onnx")
+            if os.path.exists(optimized_path):
+                return optimized_path
             
-            model = onnx.load(onnx_path)
-            
-            passes = [
-                'eliminate_deadend',
-                'eliminate_unused_initializer',
-                'fuse_consecutive_squeeze',
-                'fuse_add_bias_into_conv',
-                'fuse_bn_into_conv'
-            ]
-            
-            optimized_model = optimizer.optimize(model, passes)
+            import onnx
             
-            optimized_path = onnx_path.replace(".onnx", "_optimized.onnx")
-            onnx.save(optimized_model, optimized_path)
+            try:
+                from onnxsim import simplify
+                
+                optimized_model, check_ok = simplify(onnx.load(onnx_path))
+                if not check_ok:
+                    raise RuntimeError("onnxsim output failed validation")
+                onnx.save(optimized_model, optimized_path)
+            except ImportError:
+                import onnxruntime as ort
+                
+                # Basic level only applies standard-op rewrites (constant folding,
+                # dead node and redundant op elimination) TensorRT can still parse
+                options = ort.SessionOptions()
+                options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_BASIC
+                options.optimized_model_filepath = optimized_path
+                ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
             
             return optimized_path
             
@@ -222,6 +470,54 @@ class TensorRTQuantizer:
             return onnx_path
 
 
+def _create_entropy_calibrator(cache_file: str, calibration_data: Optional[List[Dict[str, Any]]] = None):
+    """
+    Build an INT8 entropy calibrator backed by a persistent calibration table
+    
+    Args:
+        cache_file: Calibration table path, read on later builds to skip calibration
+        calibration_data: Batches mapping input name to array
+        
+    Returns:
+        trt.IInt8EntropyCalibrator2 instance
+    """
+    import tensorrt as trt
+    
+    class EntropyCalibrator(trt.IInt8EntropyCalibrator2):
+        def __init__(self):
+            super().__init__()
+            self._batches = iter(calibration_data or [])
+            self._batch_size = 1
+            if calibration_data:
+                first_input = next(iter(calibration_data[0].values()))
+                self._batch_size = len(first_input)
+            self._device_buffers: List[Any] = []
+        
+        def get_batch_size(self) -> int:
+            return self._batch_size
+        
+        def get_batch(self, names: List[str]) -> Optional[List[int]]:
+            batch = next(self._batches, None)
+            if batch is None:
+                return None
+            
+            import torch
+            self._device_buffers = [torch.as_tensor(batch[name]).contiguous().cuda() for name in names]
+            return [int(buffer.data_ptr()) for buffer in self._device_buffers]
+        
+        def read_calibration_cache(self) -> Optional[bytes]:
+            if os.path.exists(cache_file):
+                with open(cache_file, "rb") as f:
+                    return f.read()
+            return None
+        
+        def write_calibration_cache(self, cache: bytes):
+            with open(cache_file, "wb") as f:
+                f.write(cache)
+    
+    return EntropyCalibrator()
+
+
 class UsagePredictor:
     """Predictive module loading based on query analysis"""
     
@@ -235,9 +531,12 @@ class UsagePredictor:
             ModuleType.SECURITY: ["security", "vulnerability", "threat", "attack", "protect"],
         }
         
-        self.history: List[Tuple[str, List[ModuleType], datetime]] = []
+        self.history: List[Tuple[str, FrozenSet[str], int, List[ModuleType], float]] = []
         self.max_history = 50
         self.affinity_matrix: Dict[Tuple[ModuleType, ModuleType], int] = defaultdict(int)
+        self._keyword_sets: Dict[ModuleType, FrozenSet[str]] = {
+            module_type: frozenset(keywords) for module_type, keywords in self.keyword_module_map.items()
+        }
     
     def predict(self, query: str, file_types: Optional[List[str]] = None) -> Tuple[List[ModuleType], Dict[ModuleType, float]]:
         """
@@ -251,14 +550,13 @@ class UsagePredictor:
             List of predicted module types with confidence scores
         """
         query_lower = query.lower()
-        scores: Dict[ModuleType, float] = {}
+        query_tokens = frozenset(_WORD_PATTERN.findall(query_lower))
+        query_token_count = len(query_tokens)
+        scores: Dict[ModuleType, float] = defaultdict(float)
         
-        for module_type, keywords in self.keyword_module_map.items():
-            score = 0.0
-            for keyword in keywords:
-                if keyword in query_lower:
-                    score += 1.0
-            scores[module_type] = min(score / len(keywords), 1.0)
+        # Whole-word matching, so "code" no longer matches inside "encode"
+        for module_type, keywords in self._keyword_sets.items():
+            scores[module_type] = min(len(query_tokens & keywords) / len(keywords), 1.0)
         
         if file_types:
             file_type_map = {
@@ -270,13 +568,17 @@ class UsagePredictor:
                 ".txt": ModuleType.EMBEDDING,
             }
             for ext in file_types:
-                if ext in file_type_map:
-                    scores[file_type_map[ext]] = max(scores[file_type_map[ext]], 0.8)
+                module_type = file_type_map.get(ext)
+                if module_type is not None:
+                    scores[module_type] = max(scores[module_type], 0.8)
         
         if self.history:
             similar_count = 0
-            for hist_query, modules, _ in self.history[-self.max_history:]:
-                if self._query_similarity(query_lower, hist_query) > 0.5:
+            for _, hist_tokens, hist_token_count, modules, _ in self.history[-self.max_history:]:
+                similarity = self._query_similarity(
+                    query_tokens, query_token_count, hist_tokens, hist_token_count
+                )
+                if similarity > 0.5:
                     similar_count += 1
                     for mod in modules:
                         scores[mod] = min(scores[mod] + 0.2, 1.0)
@@ -285,7 +587,7 @@ class UsagePredictor:
         top_modules = [mod for mod, score in sorted_modules if score > 0.3]
         confidence = {mod: scores[mod] for mod in top_modules}
         
-        self.history.append((query_lower, top_modules, datetime.now()))
+        self.history.append((query_lower, query_tokens, query_token_count, top_modules, time.monotonic()))
         if len(self.history) > self.max_history:
             self.history.pop(0)
         
@@ -293,12 +595,11 @@ class UsagePredictor:
         
         return top_modules, confidence
     
-    def _query_similarity(self, query1: str, query2: str) -> float:
-        """Calculate Jaccard similarity between queries"""
-        set1 = set(query1.split())
-        set2 = set(query2.split())
-        intersection = len(set1 & set2)
-        union = len(set1 | set2)
+    def _query_similarity(self, tokens1: FrozenSet[str], count1: int,
+                          tokens2: FrozenSet[str], count2: int) -> float:
+        """Calculate Jaccard similarity between pre-tokenized queries"""
+        intersection = len(tokens1 & tokens2)
+        union = count1 + count2 - intersection
         return intersection / union if union > 0 else 0.0
     
     def _update_affinity(self, modules: List[ModuleType]):
@@ -316,13 +617,22 @@ class MemoryManager:
         self.max_memory_mb = max_memory_mb
         self.allocated_mb: Dict[str, float] = {}
         self.reserved_mb = 1024
+        self._total_allocated = 0.0
         self._lock = threading.Lock()
     
+    @property
+    def total_allocated_mb(self) -> float:
+        """Total memory currently allocated to modules"""
+        return self._total_allocated
+    
+    def _available_unlocked(self) -> float:
+        used = self._total_allocated + self.reserved_mb
+        return max(0, self.max_memory_mb - used)
+    
     def get_available_memory(self) -> float:
         """Get currently available memory"""
         with self._lock:
-            used = sum(self.allocated_mb.values()) + self.reserved_mb
-            return max(0, self.max_memory_mb - used)
+            return self._available_unlocked()
     
     def allocate(self, module_name: str, size_mb: float) -> bool:
         """
@@ -336,8 +646,10 @@ class MemoryManager:
             True if allocation successful, False otherwise
         """
         with self._lock:
-            available = self.get_available_memory()
+            previous = self.allocated_mb.get(module_name, 0.0)
+            available = self._available_unlocked() + previous
             if available >= size_mb:
+                self._total_allocated += size_mb - previous
                 self.allocated_mb[module_name] = size_mb
                 logger.info(f"Allocated {size_mb}MB for {module_name}")
                 return True
@@ -356,7 +668,7 @@ class MemoryManager:
         """
         with self._lock:
             if module_name in self.allocated_mb:
-                del self.allocated_mb[module_name]
+                self._total_allocated -= self.allocated_mb.pop(module_name)
                 logger.info(f"Deallocated memory for {module_name}")
                 return True
             return False
@@ -364,7 +676,7 @@ class MemoryManager:
     def get_pressure(self) -> float:
         """Calculate memory pressure (0.0 = free, 1.0 = full)"""
         with self._lock:
-            used = sum(self.allocated_mb.values()) + self.reserved_mb
+            used = self._total_allocated + self.reserved_mb
             return min(used / self.max_memory_mb, 1.0)
 
 
@@ -374,15 +686,22 @@ class ProgressiveModelLoader:
     """
     
     def __init__(self, max_memory_mb: float = 8192, enable_quantization: bool = True,
-                 preload_threshold: float = 0.5):
+                 preload_threshold: float = 0.5, quantization_warmup_delay: float = 5.0):
         self.memory_manager = MemoryManager(max_memory_mb)
         self.quantizer = TensorRTQuantizer(enabled=enable_quantization)
         self.usage_predictor = UsagePredictor()
         self.loaded_modules: Dict[str, LoadedModule] = {}
         self.module_registry: Dict[str, ModuleSpec] = {}
-        self.preload_queue: List[ModuleType] = []
+        self.preload_queue: "queue.Queue[str]" = queue.Queue()
         self.preload_threshold = preload_threshold
-        self._lock = threading.Lock()
+        self.quantization_warmup_delay = quantization_warmup_delay
+        self._lru_heap: List[Tuple[float, int, int, str]] = []
+        self._lru_versions: Dict[str, int] = {}
+        self._deps_cache: Dict[str, List[str]] = {}
+        self._dependents: Dict[str, Set[str]] = {}
+        self._by_type: Dict[ModuleType, List[str]] = {}
+        self._module_locks: Dict[str, threading.Lock] = {}
+        self._registry_lock = threading.Lock()
         
         self._register_default_modules()
         self._start_predictive_preloader()
@@ -473,27 +792,83 @@ class ProgressiveModelLoader:
         ]
         
         for spec in default_modules:
-            self.module_registry[spec.name] = spec
+            self._add_to_registry(spec)
     
     def _start_predictive_preloader(self):
         """Start background thread for predictive preloading"""
         def preload_worker():
             while True:
+                module_name = self.preload_queue.get()
                 try:
-                    if self.preload_queue:
-                        module_name = self.preload_queue.pop(0)
-                        self.load_module(module_name, background=True)
+                    self.load_module(module_name, background=True)
                 except Exception as e:
                     logger.error(f"Preload worker error: {e}")
+                finally:
+                    self.preload_queue.task_done()
         
         thread = threading.Thread(target=preload_worker, daemon=True)
         thread.start()
+        
+        if self.quantizer.enabled:
+            warmup = threading.Timer(self.quantization_warmup_delay, self.warm_up_quantization)
+            warmup.daemon = True
+            warmup.start()
+    
+    def warm_up_quantization(self, precision: str = "int8", max_workers: int = 2) -> Dict[str, str]:
+        """
+        Quantize registered modules ahead of their first load
+        
+        ONNX export and optimization run in parallel while engine builds share
+        the quantizer's single TensorRT builder, so load_module later hits the
+        engine cache instead of building on the request path.
+        
+        Args:
+            precision: Quantization precision to build engines for
+            max_workers: Concurrent quantization jobs, kept small since each holds GPU memory
+            
+        Returns:
+            Mapping of module name to quantized model path
+        """
+        specs = [spec for spec in list(self.module_registry.values()) if spec.quantization_supported]
+        if not specs or not self.quantizer.enabled:
+            return {}
+        
+        results: Dict[str, str] = {}
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="quantize-warmup") as executor:
+            futures = {
+                executor.submit(self.quantizer.quantize_model, spec.model_path, precision): spec.name
+                for spec in specs
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    results[name], _ = future.result()
+                except Exception as e:
+                    logger.error(f"Quantization warm-up failed for {name}: {e}")
+        
+        logger.info(f"Quantization warm-up complete: {len(results)} modules")
+        return results
     
     def register_module(self, spec: ModuleSpec):
         """Register a new module specification"""
-        self.module_registry[spec.name] = spec
+        self._add_to_registry(spec)
         logger.info(f"Registered module: {spec.name}")
     
+    def _add_to_registry(self, spec: ModuleSpec):
+        """Insert a spec into the registry and its lookup indexes"""
+        previous = self.module_registry.get(spec.name)
+        if previous is not None:
+            for dep_name in previous.dependencies:
+                self._dependents.get(dep_name, set()).discard(spec.name)
+            self._by_type[previous.module_type].remove(spec.name)
+        
+        self.module_registry[spec.name] = spec
+        self._by_type.setdefault(spec.module_type, []).append(spec.name)
+        self._module_locks.setdefault(spec.name, threading.Lock())
+        for dep_name in spec.dependencies:
+            self._dependents.setdefault(dep_name, set()).add(spec.name)
+        self._deps_cache.clear()
+    
     def load_module(self, module_name: str, background: bool = False,
                     quantization_precision: str = "int8") -> LoadedModule:
         """
@@ -507,21 +882,43 @@ class ProgressiveModelLoader:
         Returns:
             LoadedModule instance
         """
-        with self._lock:
-            if module_name in self.loaded_modules:
-                module = self.loaded_modules[module_name]
-                if module.status == ModuleStatus.READY:
-                    module.spec.usage_count += 1
-                    module.spec.last_used = datetime.now()
-                    return module
-            
-            if module_name not in self.module_registry:
-                raise ValueError(f"Unknown module: {module_name}")
-            
-            spec = self.module_registry[module_name]
+        if module_name not in self.module_registry:
+            raise ValueError(f"Unknown module: {module_name}")
+        
+        # Dependencies are loaded as needed but not counted as used
+        for dep_name in self._resolve_deps(module_name):
+            self._load_single(dep_name, record_use=False)
+        
+        return self._load_single(module_name, quantization_precision)
+    
+    def _load_single(self, module_name: str, quantization_precision: str = "int8",
+                     record_use: bool = True) -> LoadedModule:
+        """
+        Load one module whose dependencies are already loaded
+        
+        Args:
+            module_name: Name of the module to load
+            quantization_precision: Quantization precision for optimization
+            record_use: Count a request for an already loaded module as a use,
+                updating its usage count and LRU position
             
-            if self.memory_manager.get_pressure() > 0.9:
-                self._free_memory_for_load(spec.memory_requirement_mb)
+        Returns:
+            LoadedModule instance
+        """
+        with self._module_locks[module_name]:
+            with self._registry_lock:
+                module = self.loaded_modules.get(module_name)
+                if module is not None and module.status == ModuleStatus.READY:
+                    if record_use:
+                        module.spec.usage_count += 1
+                        module.spec.last_used = time.monotonic()
+                        self._touch_lru(module_name)
+                    return module
+                
+                spec = self.module_registry[module_name]
+                
+                if self.memory_manager.get_pressure() > 0.9:
+                    self._free_memory_for_load(spec.memory_requirement_mb)
             
             if not self.memory_manager.allocate(module_name, spec.memory_requirement_mb):
                 raise MemoryError(f"Cannot allocate memory for {module_name}")
@@ -532,31 +929,67 @@ class ProgressiveModelLoader:
                 load_time=datetime.now(),
                 memory_allocated_mb=spec.memory_requirement_mb
             )
-            self.loaded_modules[module_name] = loaded_module
-        
-        try:
-            for dep_name in spec.dependencies:
-                if dep_name not in self.loaded_modules:
-                    self.load_module(dep_name, background=background)
-            
-            if spec.quantization_supported and self.quantizer.enabled:
-                quantized_path, _ = self.quantizer.quantize_model(
-                    spec.model_path, quantization_precision
-                )
+            with self._registry_lock:
+                self.loaded_modules[module_name] = loaded_module
             
-            logger.info(f"Module loaded successfully: {module_name}")
-            
-            loaded_module.status = ModuleStatus.READY
-            loaded_module.spec.last_used = datetime.now()
-            
-            return loaded_module
+            try:
+                if spec.quantization_supported and self.quantizer.enabled:
+                    quantized_path, _ = self.quantizer.quantize_model(
+                        spec.model_path, quantization_precision
+                    )
+                
+                logger.info(f"Module loaded successfully: {module_name}")
+                
+                with self._registry_lock:
+                    loaded_module.status = ModuleStatus.READY
+                    loaded_module.spec.last_used = time.monotonic()
+                    self._touch_lru(module_name)
+                
+                return loaded_module
+                
+            except Exception as e:
+                loaded_module.status = ModuleStatus.ERROR
+                loaded_module.error_message = str(e)
+                self.memory_manager.deallocate(module_name)
+                logger.error(f"Module loading failed: {module_name} - {e}")
+                raise
+    
+    def _resolve_deps(self, module_name: str) -> List[str]:
+        """
+        Resolve transitive dependencies of a module in load order
+        
+        Args:
+            module_name: Name of the module to resolve
             
-        except Exception as e:
-            loaded_module.status = ModuleStatus.ERROR
-            loaded_module.error_message = str(e)
-            self.memory_manager.deallocate(module_name)
-            logger.error(f"Module loading failed: {module_name} - {e}")
-            raise
+        Returns:
+            Dependency names, each listed after its own dependencies
+        """
+        if module_name in self._deps_cache:
+            return self._deps_cache[module_name]
+        
+        order: List[str] = []
+        visiting: Set[str] = set()
+        visited: Set[str] = set()
+        
+        def visit(name: str):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Circular dependency involving module: {name}")
+            if name not in self.module_registry:
+                raise ValueError(f"Unknown module: {name}")
+            visiting.add(name)
+            for dep_name in self.module_registry[name].dependencies:
+                visit(dep_name)
+            visiting.discard(name)
+            visited.add(name)
+            order.append(name)
+        
+        visit(module_name)
+        order.pop()
+        
+        self._deps_cache[module_name] = order
+        return order
     
     def unload_module(self, module_name: str) -> bool:
         """
@@ -568,38 +1001,39 @@ class ProgressiveModelLoader:
         Returns:
             True if successful
         """
-        with self._lock:
-            if module_name not in self.loaded_modules:
-                return False
-            
-            module = self.loaded_modules[module_name]
-            
-            if module.status == ModuleStatus.LOADING:
-                return False
-            
-            if module.spec.priority >= 10:
-                logger.warning(f"Cannot unload core module: {module_name}")
-                return False
-            
-            dependents = self._get_dependents(module_name)
-            if dependents:
-                logger.warning(f"Module has dependents: {dependents}")
-                return False
-            
-            module.status = ModuleStatus.UNLOADING
-            self.memory_manager.deallocate(module_name)
-            del self.loaded_modules[module_name]
-            
-            logger.info(f"Module unloaded: {module_name}")
-            return True
+        with self._registry_lock:
+            return self._unload_unlocked(module_name)
+    
+    def _unload_unlocked(self, module_name: str) -> bool:
+        """Unload a module; caller must hold self._registry_lock"""
+        if module_name not in self.loaded_modules:
+            return False
+        
+        module = self.loaded_modules[module_name]
+        
+        if module.status == ModuleStatus.LOADING:
+            return False
+        
+        if module.spec.priority >= 10:
+            logger.warning(f"Cannot unload core module: {module_name}")
+            return False
+        
+        dependents = self._get_dependents(module_name)
+        if dependents:
+            logger.warning(f"Module has dependents: {dependents}")
+            return False
+        
+        module.status = ModuleStatus.UNLOADING
+        self.memory_manager.deallocate(module_name)
+        del self.loaded_modules[module_name]
+        self._lru_versions.pop(module_name, None)
+        
+        logger.info(f"Module unloaded: {module_name}")
+        return True
     
     def _get_dependents(self, module_name: str) -> List[str]:
         """Get list of modules depending on the specified module"""
-        dependents = []
-        for name, module in self.loaded_modules.items():
-            if module_name in module.spec.dependencies:
-                dependents.append(name)
-        return dependents
+        return [name for name in self._dependents.get(module_name, ()) if name in self.loaded_modules]
     
     def _free_memory_for_load(self, required_mb: float):
         """Free memory using LRU eviction strategy"""
@@ -609,20 +1043,43 @@ class ProgressiveModelLoader:
         if needed <= 0:
             return
         
-        candidates = [
-            (name, module) for name, module in self.loaded_modules.items()
-            if module.status == ModuleStatus.READY and module.spec.priority < 10
-        ]
-        
-        candidates.sort(key=lambda x: (x[1].spec.last_used or datetime.min, x[1].spec.priority))
-        
-        for name, module in candidates:
-            if self.unload_module(name):
+        retained = []
+        while needed > 0 and self._lru_heap:
+            entry = heapq.heappop(self._lru_heap)
+            _, _, version, name = entry
+            if self._lru_versions.get(name) != version:
+                continue
+            
+            module = self.loaded_modules.get(name)
+            if module is None or module.status != ModuleStatus.READY:
+                continue
+            
+            if self._unload_unlocked(name):
                 freed = module.memory_allocated_mb
                 needed -= freed
                 logger.info(f"Freed {freed}MB by unloading {name}")
-                if needed <= 0:
-                    break
+            else:
+                retained.append(entry)
+        
+        for entry in retained:
+            heapq.heappush(self._lru_heap, entry)
+    
+    def _touch_lru(self, module_name: str):
+        """Record the latest use of a module in the lazily-invalidated LRU heap"""
+        spec = self.module_registry[module_name]
+        if spec.priority >= 10:
+            return
+        
+        version = self._lru_versions.get(module_name, 0) + 1
+        self._lru_versions[module_name] = version
+        heapq.heappush(self._lru_heap, (spec.last_used, spec.priority, version, module_name))
+        
+        if len(self._lru_heap) > 2 * len(self._lru_versions) + 32:
+            self._lru_heap = [
+                entry for entry in self._lru_heap
+                if self._lru_versions.get(entry[3]) == entry[2]
+            ]
+            heapq.heapify(self._lru_heap)
     
     def preload_for_query(self, query: str, file_types: Optional[List[str]] = None):
         """Predict and preload modules for an anticipated query"""
@@ -630,10 +1087,10 @@ class ProgressiveModelLoader:
         
         for module_type in predicted_modules:
             if confidence[module_type] > self.preload_threshold:
-                for name, spec in self.module_registry.items():
-                    if spec.module_type == module_type and spec.priority < 8:
-                        if name not in self.loaded_modules:
-                            self.preload_queue.append(name)
+                for name in self._by_type.get(module_type, ()):
+                    spec = self.module_registry[name]
+                    if spec.priority < 8 and name not in self.loaded_modules:
+                        self.preload_queue.put(name)
     
     def get_loaded_modules(self) -> List[Dict]:
         """Get status of all loaded modules"""
@@ -645,14 +1102,14 @@ class ProgressiveModelLoader:
                 "memory_mb": module.memory_allocated_mb,
                 "load_time": module.load_time.isoformat()
             }
-            for name, module in self.loaded_modules.items()
+            for name, module in list(self.loaded_modules.items())
         ]
     
     def get_memory_status(self) -> Dict:
         """Get current memory status"""
         return {
             "total_mb": self.memory_manager.max_memory_mb,
-            "allocated_mb": sum(m.allocated_mb for m in self.memory_manager.allocated_mb.values()),
+            "allocated_mb": self.memory_manager.total_allocated_mb,
             "available_mb": self.memory_manager.get_available_memory(),
             "pressure": self.memory_manager.get_pressure(),
             "loaded_count": len(self.loaded_modules)
@@ -4,16 +4,21 @@ Consolidates routing intelligence from Parts I-IV
 """
 
 from enum import Enum
-from dataclasses import dataclass, field
-from typing import Optional, Dict, List, Tuple, Any
+from dataclasses import dataclass, field, replace
+from typing import Optional, Dict, List, Tuple, Any, NamedTuple, TypedDict, Final
 from datetime import datetime
+from types import MappingProxyType
 import re
+from array import array
+from bisect import bisect_right
 import psutil
 import socket
+import threading
+import time
 import json
-import hashlib
+import functools
 import logging
-from collections import defaultdict
+from collections import defaultdict, deque, OrderedDict
 from abc import ABC, abstractmethod
 
 # Configure logging
@@ -21,6 +26,129 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# Fixed for the process lifetime; psutil reports None when it cannot tell
+_CPU_COUNT: Final = psutil.cpu_count() or 1
+
+# NVML device handles, opened on first device detection
+_nvml_handles: Optional[List[Any]] = None
+
+
+def _get_nvml_handles() -> List[Any]:
+    """NVML handles for all GPUs, initialized once per process (empty without an NVIDIA driver)"""
+    global _nvml_handles
+    if _nvml_handles is None:
+        try:
+            import pynvml
+            pynvml.nvmlInit()
+            _nvml_handles = [
+                pynvml.nvmlDeviceGetHandleByIndex(i) for i in range(pynvml.nvmlDeviceGetCount())
+            ]
+        except Exception:
+            _nvml_handles = []
+    return _nvml_handles
+
+
+# A pattern that is just one literal word followed by whitespace, optionally anchored
+_LITERAL_WORD_PATTERN: Final = re.compile(r"(\^?)([a-z]+)\\s\+")
+
+
+def _compile_union(patterns: List[str], flags: int = 0) -> "re.Pattern[str]":
+    """Compile patterns into one alternation; group pN identifies which pattern matched"""
+    return re.compile("|".join(f"(?P<p{i}>{pattern})" for i, pattern in enumerate(patterns)), flags)
+
+
+def _union_index(match: "re.Match[str]") -> int:
+    """Index of the _compile_union alternative that produced match"""
+    return int(match.lastgroup[1:]) if match.lastgroup else 0
+
+
+@functools.lru_cache(maxsize=None)
+def _load_darpa() -> bool:
+    """Import the DARPA AIxCC tools once per process; True if they are installed"""
+    try:
+        from darpa_tools import buttercup, sweetbaby
+        return True
+    except ImportError:
+        return False
+
+
+class _HyperscanMatcher:
+    """
+    Hyperscan database reporting, per slot, the highest tag among matching patterns
+    
+    Each pattern carries a tag and the slot it reports into, so one pass can
+    answer several independent "highest match" questions.
+    """
+    
+    def __init__(self, hyperscan: Any, patterns: List[str], tags: List[int],
+                 slots: Optional[List[int]] = None) -> None:
+        self._hyperscan = hyperscan
+        self._tags = tags
+        self._slots = slots or [0] * len(patterns)
+        self._ceilings = [0] * (max(self._slots) + 1)
+        for slot, tag in zip(self._slots, tags):
+            self._ceilings[slot] = max(self._ceilings[slot], tag)
+        self._db = hyperscan.Database()
+        self._db.compile(
+            expressions=[pattern.encode() for pattern in patterns],
+            ids=list(range(len(patterns))),
+            flags=[
+                hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH
+                | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP
+            ] * len(patterns)
+        )
+        # Scratch space is per scanning thread
+        self._local = threading.local()
+    
+    def max_tags(self, text: str) -> List[int]:
+        """Highest tag per slot among patterns matching text, 0 for slots without a match"""
+        scratch = getattr(self._local, "scratch", None)
+        if scratch is None:
+            scratch = self._local.scratch = self._hyperscan.Scratch(self._db)
+        
+        found = [0] * len(self._ceilings)
+        open_slots = [len(found)]
+        tags = self._tags
+        slots = self._slots
+        ceilings = self._ceilings
+        
+        def on_match(pattern_id: int, start: int, end: int, flags: int, context: Any) -> bool:
+            slot = slots[pattern_id]
+            tag = tags[pattern_id]
+            if tag > found[slot]:
+                found[slot] = tag
+                if tag == ceilings[slot]:
+                    open_slots[0] -= 1
+            # Stop once every slot has seen its highest possible tag
+            return open_slots[0] == 0
+        
+        try:
+            self._db.scan(text.encode(), match_event_handler=on_match, scratch=scratch)
+        except self._hyperscan.ScanTerminated:
+            pass
+        return found
+    
+    def max_tag(self, text: str) -> int:
+        """Highest tag of any pattern matching text, 0 if none match"""
+        return self.max_tags(text)[0]
+
+
+def _hyperscan_matcher(patterns: List[str], tags: List[int],
+                       slots: Optional[List[int]] = None) -> Optional[_HyperscanMatcher]:
+    """Build a Hyperscan matcher, or None to use the re engine instead"""
+    if not patterns:
+        return None
+    try:
+        import hyperscan
+    except ImportError:
+        return None
+    try:
+        return _HyperscanMatcher(hyperscan, patterns, tags, slots)
+    except Exception as e:
+        logger.warning(f"Hyperscan compilation failed, using re engine: {e}")
+        return None
+
+
 class QueryComplexity(Enum):
     """Query complexity taxonomy with 5 levels"""
     TRIVIAL = 1
@@ -38,14 +166,33 @@ class ExecutionMode(Enum):
     CLOUD_ONLY = "cloud_only"
 
 
+class ModelRequirements(NamedTuple):
+    """Resource requirements of a model size"""
+    ram_gb: float
+    vram_gb: float
+    parameters: str
+
+
 class ModelSize(Enum):
     """Model size variants with resource requirements"""
-    NANO_1B = {"ram_gb": 2, "vram_gb": 0.5, "parameters": "1B"}
-    SMALL_3B = {"ram_gb": 6, "vram_gb": 2, "parameters": "3B"}
-    MEDIUM_7B = {"ram_gb": 14, "vram_gb": 4, "parameters": "7B"}
-    LARGE_13B = {"ram_gb": 26, "vram_gb": 8, "parameters": "13B"}
-    XL_34B = {"ram_gb": 68, "vram_gb": 16, "parameters": "34B"}
-    ULTRA_200B = {"ram_gb": 400, "vram_gb": 80, "parameters": "200B"}
+    NANO_1B = ModelRequirements(ram_gb=2, vram_gb=0.5, parameters="1B")
+    SMALL_3B = ModelRequirements(ram_gb=6, vram_gb=2, parameters="3B")
+    MEDIUM_7B = ModelRequirements(ram_gb=14, vram_gb=4, parameters="7B")
+    LARGE_13B = ModelRequirements(ram_gb=26, vram_gb=8, parameters="13B")
+    XL_34B = ModelRequirements(ram_gb=68, vram_gb=16, parameters="34B")
+    ULTRA_200B = ModelRequirements(ram_gb=400, vram_gb=80, parameters="200B")
+
+
+# Models in ascending RAM order with a parallel array of requirements for bisection
+_MODELS_BY_RAM: Final[Tuple[ModelSize, ...]] = tuple(sorted(ModelSize, key=lambda m: m.value.ram_gb))
+_RAM_GB: Final = array("d", [m.value.ram_gb for m in _MODELS_BY_RAM])
+_MODEL_RANK: Final[Dict[ModelSize, int]] = {model: i for i, model in enumerate(_MODELS_BY_RAM)}
+
+
+def _largest_fitting_model(ram_gb: float, limit: int = len(_MODELS_BY_RAM)) -> ModelSize:
+    """Largest of the first `limit` models whose RAM requirement fits, else the smallest model"""
+    index = min(bisect_right(_RAM_GB, ram_gb), limit) - 1
+    return _MODELS_BY_RAM[max(0, index)]
 
 
 class SecurityLevel(Enum):
@@ -55,7 +202,7 @@ class SecurityLevel(Enum):
     CRITICAL = "critical"
 
 
-@dataclass
+@dataclass(slots=True)
 class DeviceCapability:
     """Device hardware specifications"""
     cpu_cores: int
@@ -72,16 +219,15 @@ class DeviceCapability:
     @staticmethod
     def detect() -> 'DeviceCapability':
         """Factory method for dynamic capability detection"""
-        import GPUtil
-        try:
-            gpus = GPUtil.getGPUs()
-            has_gpu = len(gpus) > 0
-            vram_total = sum(gpu.memoryTotal for gpu in gpus) / 1024 if has_gpu else 0
-            vram_available = sum(gpu.memoryFree for gpu in gpus) / 1024 if has_gpu else 0
-        except ImportError:
-            has_gpu = False
-            vram_total = 0
-            vram_available = 0
+        handles = _get_nvml_handles()
+        has_gpu = len(handles) > 0
+        vram_total = 0
+        vram_available = 0
+        if has_gpu:
+            import pynvml
+            gpu_memory = [pynvml.nvmlDeviceGetMemoryInfo(handle) for handle in handles]
+            vram_total = sum(m.total for m in gpu_memory) / (1024**3)
+            vram_available = sum(m.free for m in gpu_memory) / (1024**3)
         
         battery = None
         try:
@@ -90,11 +236,13 @@ class DeviceCapability:
         except Exception:
             battery_percent = None
         
+        memory = psutil.virtual_memory()
+        
         return DeviceCapability(
-            cpu_cores=psutil.cpu_count(),
-            cpu_percent=psutil.cpu_percent(),
-            ram_total_gb=psutil.virtual_memory().total / (1024**3),
-            ram_available_gb=psutil.virtual_memory().available / (1024**3),
+            cpu_cores=_CPU_COUNT,
+            cpu_percent=psutil.cpu_percent(interval=None),
+            ram_total_gb=memory.total / (1024**3),
+            ram_available_gb=memory.available / (1024**3),
             vram_total_gb=vram_total,
             vram_available_gb=vram_available,
             has_gpu=has_gpu,
@@ -104,7 +252,7 @@ class DeviceCapability:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class ConnectivityStatus:
     """Network connectivity assessment"""
     is_available: bool
@@ -114,30 +262,31 @@ class ConnectivityStatus:
     last_check: datetime
     
     @staticmethod
-    def check() -> 'ConnectivityStatus':
-        """Check network availability and quality"""
+    def check(bandwidth_mbps: float = 100.0) -> 'ConnectivityStatus':
+        """
+        Check network availability and quality
+        
+        Args:
+            bandwidth_mbps: Configured bandwidth to report when the network is up
+        """
         is_available = False
         connection_type = "unknown"
         latency_ms = 0.0
+        configured_bandwidth_mbps = bandwidth_mbps
         bandwidth_mbps = 0.0
         
         try:
             sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             sock.settimeout(2)
+            started = time.perf_counter()
             is_available = sock.connect_ex(("8.8.8.8", 53)) == 0
+            connect_ms = (time.perf_counter() - started) * 1000
             sock.close()
             
             if is_available:
                 connection_type = "broadband"
-                try:
-                    import speedtest
-                    st = speedtest.Speedtest()
-                    st.get_best_server()
-                    latency_ms = st.results.ping
-                    bandwidth_mbps = st.download() / 1e6
-                except ImportError:
-                    latency_ms = 50.0
-                    bandwidth_mbps = 100.0
+                latency_ms = connect_ms
+                bandwidth_mbps = configured_bandwidth_mbps
         except Exception as e:
             logger.warning(f"Connectivity check failed: {e}")
         
@@ -150,7 +299,49 @@ class ConnectivityStatus:
         )
 
 
-@dataclass
+# Sorted VRAM requirements, the thresholds model selection compares against
+_VRAM_GB: Final = array("d", sorted(m.value.vram_gb for m in ModelSize))
+
+
+def _device_signature(device: DeviceCapability) -> Tuple[bool, bool, bool, int, int]:
+    """
+    What routing decisions depend on in a device snapshot
+    
+    RAM and VRAM are reduced to the band between the model requirements they
+    fall in, which covers every threshold the router compares them against.
+    """
+    low_battery = bool(device.battery_percent and device.battery_percent < 20)
+    return (
+        device.has_gpu,
+        device.is_metered,
+        low_battery,
+        bisect_right(_RAM_GB, device.ram_available_gb),
+        bisect_right(_VRAM_GB, device.vram_available_gb),
+    )
+
+
+def _connectivity_signature(connectivity: ConnectivityStatus) -> Tuple[bool, str]:
+    """What routing decisions depend on in a connectivity snapshot"""
+    return connectivity.is_available, connectivity.connection_type
+
+
+class RoutingReasoning(TypedDict, total=False):
+    """Rationale attached to a routing decision"""
+    source: str
+    value: str
+    complexity_level: str
+    complexity_value: int
+    device_has_gpu: bool
+    device_ram_gb: float
+    network_available: bool
+    network_type: str
+    latency_ms: float
+    security_level: str
+    battery_percent: Optional[float]
+    is_metered: bool
+
+
+@dataclass(slots=True)
 class RoutingDecision:
     """Complete routing decision with rationale"""
     execution_mode: ExecutionMode
@@ -161,15 +352,26 @@ class RoutingDecision:
     estimated_latency_ms: float
     estimated_cost: float
     fallback_chain: List[ExecutionMode]
-    reasoning: Dict[str, Any]
+    # None while deferred by a SmartRouter with lazy_reasoning; see build_reasoning
+    reasoning: Optional[RoutingReasoning]
     timestamp: datetime
+    # Inputs to build deferred reasoning from, set by the router
+    _reasoning_args: Optional[Tuple[QueryComplexity, DeviceCapability, ConnectivityStatus, SecurityLevel]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    
+    def build_reasoning(self) -> Optional[RoutingReasoning]:
+        """Decision rationale, building it first if the router deferred it"""
+        if self.reasoning is None and self._reasoning_args is not None:
+            self.reasoning = SmartRouter._build_reasoning(*self._reasoning_args)
+        return self.reasoning
 
 
 class ComplexityAnalyzer:
     """Multi-pattern query complexity assessment"""
     
-    def __init__(self):
-        self.patterns = {
+    def __init__(self) -> None:
+        self.patterns: Dict[QueryComplexity, List[str]] = {
             QueryComplexity.TRIVIAL: [
                 r"^(what|who|when|where|how)\s+(is|are|do|does)\s+",
                 r"^define\s+",
@@ -202,9 +404,46 @@ class ComplexityAnalyzer:
             ]
         }
         
-        self.history: Dict[str, Tuple[QueryComplexity, datetime]] = {}
+        # Single-word patterns become dictionary lookups on the query's words;
+        # only the remaining patterns need the regex engine
+        self._first_word_levels: Dict[str, int] = {}
+        self._word_levels: Dict[str, int] = {}
+        residual: Dict[QueryComplexity, List[str]] = defaultdict(list)
+        for complexity, patterns in self.patterns.items():
+            for pattern in patterns:
+                literal = _LITERAL_WORD_PATTERN.fullmatch(pattern)
+                if literal is None:
+                    residual[complexity].append(pattern)
+                    continue
+                levels = self._first_word_levels if literal.group(1) else self._word_levels
+                levels[literal.group(2)] = max(levels.get(literal.group(2), 0), complexity.value)
+        self._word_set = frozenset(self._word_levels)
+        
+        self._residual: List[Tuple[str, int]] = [
+            (pattern, complexity.value)
+            for complexity, patterns in residual.items()
+            for pattern in patterns
+        ]
+        
+        # Highest level first so the most complex matching tier wins; built once
+        # so analyze() walks a fixed tuple instead of re-deriving the order
+        self._compiled: Tuple[Tuple[QueryComplexity, "re.Pattern[str]"], ...] = tuple(
+            (complexity, _compile_union(residual[complexity]))
+            for complexity in sorted(residual, key=lambda c: c.value, reverse=True)
+        )
+        
+        # With hyperscan installed all residual patterns are matched in a single pass
+        self._hyperscan = _hyperscan_matcher(
+            [pattern for pattern, _ in self._residual],
+            [level for _, level in self._residual]
+        )
+        
+        # Keyed by hash() of the normalized query (history is process-local);
+        # entries carry time.monotonic() stamps
+        self.history: "OrderedDict[int, Tuple[QueryComplexity, float]]" = OrderedDict()
         self.max_history = 1000
         self.history_ttl_days = 30
+        self._history_ttl_seconds = self.history_ttl_days * 86400.0
     
     def analyze(self, query: str) -> Tuple[QueryComplexity, float]:
         """
@@ -216,27 +455,63 @@ class ComplexityAnalyzer:
         Returns:
             Tuple of (complexity level, confidence score)
         """
-        query_lower = query.lower().strip()
-        word_count = len(query_lower.split())
+        return self._analyze_normalized(query.lower().strip(), time.monotonic())
+    
+    def analyze_batch(self, queries: List[str]) -> List[Tuple[QueryComplexity, float]]:
+        """
+        Analyze complexity for a batch of queries
+        
+        Args:
+            queries: Query texts to classify
+            
+        Returns:
+            List of (complexity level, confidence score) tuples, one per query
+        """
+        analyze = self._analyze_normalized
+        now = time.monotonic()
+        return [analyze(query_lower, now) for query_lower in [q.lower().strip() for q in queries]]
+    
+    def _analyze_normalized(self, query_lower: str, now: float,
+                            residual_level: Optional[int] = None) -> Tuple[QueryComplexity, float]:
+        """
+        Classify an already lowercased and stripped query
         
-        hash_key = hashlib.md5(query_lower.encode()).hexdigest()
-        if hash_key in self.history:
-            stored_complexity, timestamp = self.history[hash_key]
-            if (datetime.now() - timestamp).days < self.history_ttl_days:
+        Args:
+            query_lower: Normalized query text
+            now: time.monotonic() timestamp for the history entry
+            residual_level: Highest level among residual patterns if the caller
+                already scanned for them, None to scan here
+        """
+        words = query_lower.split()
+        word_count = len(words)
+        
+        hash_key = hash(query_lower)
+        entry = self.history.get(hash_key)
+        if entry is not None:
+            stored_complexity, timestamp = entry
+            if now - timestamp < self._history_ttl_seconds:
+                self.history.move_to_end(hash_key)
                 return stored_complexity, 0.95
         
         confidence = 0.5
         matched_complexity = QueryComplexity.MODERATE
         
-        for complexity, patterns in reversed(list(self.patterns.items())):
-            for pattern in patterns:
-                if re.search(pattern, query_lower):
-                    matched_complexity = complexity
-                    confidence = 0.85 if complexity != QueryComplexity.MODERATE else 0.7
+        best_level = self._literal_level(words)
+        if residual_level is not None:
+            best_level = max(best_level, residual_level)
+        elif self._hyperscan is not None:
+            best_level = max(best_level, self._hyperscan.max_tag(query_lower))
+        else:
+            for complexity, union in self._compiled:
+                if complexity.value <= best_level:
                     break
-            else:
-                continue
-            break
+                if union.search(query_lower):
+                    best_level = complexity.value
+                    break
+        
+        if best_level:
+            matched_complexity = QueryComplexity(best_level)
+            confidence = 0.85 if matched_complexity != QueryComplexity.MODERATE else 0.7
         
         if word_count < 5 and matched_complexity.value >= QueryComplexity.MODERATE.value:
             matched_complexity = QueryComplexity(max(1, matched_complexity.value - 1))
@@ -245,19 +520,29 @@ class ComplexityAnalyzer:
             matched_complexity = QueryComplexity(min(5, matched_complexity.value + 1))
             confidence *= 0.9
         
-        self.history[hash_key] = (matched_complexity, datetime.now())
-        if len(self.history) > self.max_history:
-            oldest_keys = list(self.history.keys())[:100]
-            for key in oldest_keys:
-                del self.history[key]
+        self.history[hash_key] = (matched_complexity, now)
+        self.history.move_to_end(hash_key)
+        while len(self.history) > self.max_history:
+            self.history.popitem(last=False)
         
         return matched_complexity, confidence
+    
+    def _literal_level(self, words: List[str]) -> int:
+        """Highest complexity value among single-word patterns present in the query (0 if none)"""
+        if len(words) < 2:
+            # Every literal pattern needs trailing whitespace, i.e. a following word
+            return 0
+        
+        level = self._first_word_levels.get(words[0], 0)
+        for word in self._word_set.intersection(words[:-1]):
+            level = max(level, self._word_levels[word])
+        return level
 
 
 class DARPAToolIntegrator:
     """Integration with DARPA AIxCC tools for security operations"""
     
-    def __init__(self, enabled: bool = True):
+    def __init__(self, enabled: bool = True, history_size: int = 1000) -> None:
         self.enabled = enabled
         self.tool_status = {
             "buttercup": False,
@@ -265,21 +550,62 @@ class DARPAToolIntegrator:
             "xbow": False,
             "ludushound": False
         }
-        self.vulnerability_history: List[Dict] = []
+        # Most recent events only; lifetime totals per level live in _event_counts
+        self.vulnerability_history: "deque[Dict[str, str]]" = deque(maxlen=history_size)
+        self._event_counts: Dict[str, int] = defaultdict(int)
+        
+        self.critical_patterns = [
+            r"sudo\s+",
+            r"rm\s+-rf",
+            r"chmod\s+777",
+            r"drop\s+database",
+            r"delete\s+from\s+\w+",
+            r"eval\s*\(",
+            r"exec\s*\(",
+            r"subprocess",
+        ]
+        
+        self.elevated_patterns = [
+            r"import\s+os",
+            r"import\s+sys",
+            r"file\s+(read|write|create)",
+            r"connect\s+to\s+(database|server|api)",
+            r"http\s*(request|get|post)",
+        ]
+        
+        # (critical, elevated) unions, compiled on first assessment so
+        # construction stays cheap
+        self._rx: Optional[Tuple["re.Pattern[str]", "re.Pattern[str]"]] = None
+        self._hyperscan: Optional[_HyperscanMatcher] = None
+        
         self._initialize_tools()
     
-    def _initialize_tools(self):
+    def _compile_patterns(self) -> Tuple["re.Pattern[str]", "re.Pattern[str]"]:
+        """Compile the critical and elevated pattern banks"""
+        # Hyperscan pre-screens both banks in one pass (2 = critical, 1 = elevated);
+        # the re unions then only run to name the matching pattern
+        self._hyperscan = _hyperscan_matcher(
+            self.critical_patterns + self.elevated_patterns,
+            [2] * len(self.critical_patterns) + [1] * len(self.elevated_patterns)
+        )
+        # Case-insensitive so queries are scanned without a lowercased copy
+        self._rx = (
+            _compile_union(self.critical_patterns, re.IGNORECASE),
+            _compile_union(self.elevated_patterns, re.IGNORECASE)
+        )
+        return self._rx
+    
+    def _initialize_tools(self) -> None:
         """Initialize DARPA tool connections"""
         if not self.enabled:
             logger.info("DARPA tools integration disabled")
             return
         
-        try:
-            from darpa_tools import buttercup, sweetbaby
+        if _load_darpa():
             self.tool_status["buttercup"] = True
             self.tool_status["sweetbaby"] = True
             logger.info("DARPA tools initialized successfully")
-        except ImportError:
+        else:
             logger.warning("DARPA tools not available, using fallback security")
     
     def assess_security_level(self, operation: str, query: str) -> SecurityLevel:
@@ -296,40 +622,41 @@ class DARPAToolIntegrator:
         if not self.enabled:
             return SecurityLevel.STANDARD
         
-        critical_patterns = [
-            r"sudo\s+",
-            r"rm\s+-rf",
-            r"chmod\s+777",
-            r"drop\s+database",
-            r"delete\s+from\s+\w+",
-            r"eval\s*\(",
-            r"exec\s*\(",
-            r"subprocess",
-        ]
+        if self._rx is None:
+            self._compile_patterns()
         
-        elevated_patterns = [
-            r"import\s+os",
-            r"import\s+sys",
-            r"file\s+(read|write|create)",
-            r"connect\s+to\s+(database|server|api)",
-            r"http\s*(request|get|post)",
-        ]
+        severity = self._hyperscan.max_tag(query) if self._hyperscan is not None else 2
+        return self._assess_severity(operation, query, severity)
+    
+    def _assess_severity(self, operation: str, query: str, severity: int) -> SecurityLevel:
+        """
+        Resolve the security level once the possible severity is known
         
-        query_lower = query.lower()
+        Args:
+            operation: Type of operation
+            query: The query content
+            severity: Upper bound on the match (2 = critical, 1 = elevated, 0 = none)
+        """
+        if severity == 0:
+            return SecurityLevel.STANDARD
         
-        for pattern in critical_patterns:
-            if re.search(pattern, query_lower):
-                self._log_security_event("critical", operation, pattern)
-                return SecurityLevel.CRITICAL
+        critical_rx, elevated_rx = self._rx or self._compile_patterns()
         
-        for pattern in elevated_patterns:
-            if re.search(pattern, query_lower):
-                self._log_security_event("elevated", operation, pattern)
-                return SecurityLevel.ELEVATED
+        match = critical_rx.search(query) if severity == 2 else None
+        if match:
+            pattern = self.critical_patterns[_union_index(match)]
+            self._log_security_event("critical", operation, pattern)
+            return SecurityLevel.CRITICAL
+        
+        match = elevated_rx.search(query)
+        if match:
+            pattern = self.elevated_patterns[_union_index(match)]
+            self._log_security_event("elevated", operation, pattern)
+            return SecurityLevel.ELEVATED
         
         return SecurityLevel.STANDARD
     
-    def _log_security_event(self, level: str, operation: str, pattern: str):
+    def _log_security_event(self, level: str, operation: str, pattern: str) -> None:
         """Log security-relevant events"""
         event = {
             "timestamp": datetime.now().isoformat(),
@@ -338,7 +665,12 @@ class DARPAToolIntegrator:
             "pattern": pattern
         }
         self.vulnerability_history.append(event)
+        self._event_counts[level] += 1
         logger.warning(f"Security event: {level} - {operation}")
+    
+    def get_event_counts(self) -> Dict[str, int]:
+        """Total security events per level since startup"""
+        return dict(self._event_counts)
 
 
 class SmartRouter:
@@ -346,61 +678,138 @@ class SmartRouter:
     Main routing engine coordinating query routing decisions
     """
     
+    # Read-only views; the hot path uses the tables derived from them below
+    
     # Model requirements matrix
-    MODEL_REQUIREMENTS = {
+    MODEL_REQUIREMENTS = MappingProxyType({
         QueryComplexity.TRIVIAL: ModelSize.NANO_1B,
         QueryComplexity.SIMPLE: ModelSize.SMALL_3B,
         QueryComplexity.MODERATE: ModelSize.MEDIUM_7B,
         QueryComplexity.COMPLEX: ModelSize.LARGE_13B,
         QueryComplexity.EXPERT: ModelSize.XL_34B,
-    }
+    })
     
     # Cost estimation (per 1K tokens)
-    COST_PER_MODEL = {
+    COST_PER_MODEL = MappingProxyType({
         ModelSize.NANO_1B: 0.30,
         ModelSize.SMALL_3B: 0.45,
         ModelSize.MEDIUM_7B: 0.60,
         ModelSize.LARGE_13B: 0.90,
         ModelSize.XL_34B: 1.20,
         ModelSize.ULTRA_200B: 1.50,
-    }
+    })
     
     # Latency estimates (baseline ms + per token)
-    LATENCY_BASELINE = {
+    LATENCY_BASELINE = MappingProxyType({
         ExecutionMode.OFFLINE_LOCAL: 15,
         ExecutionMode.HYBRID_LOCAL_FIRST: 25,
         ExecutionMode.HYBRID_CLOUD_FIRST: 80,
         ExecutionMode.CLOUD_ONLY: 120,
-    }
+    })
     
-    def __init__(self, darpa_enabled: bool = True, cache_ttl: int = 5):
+    # Per-token latency by execution mode
+    LATENCY_PER_TOKEN_MS = MappingProxyType({
+        ExecutionMode.OFFLINE_LOCAL: 0.5,
+        ExecutionMode.HYBRID_LOCAL_FIRST: 0.8,
+        ExecutionMode.HYBRID_CLOUD_FIRST: 1.5,
+        ExecutionMode.CLOUD_ONLY: 2.0,
+    })
+    
+    def __init__(self, darpa_enabled: bool = True, cache_ttl: int = 5,
+                 decision_cache_size: int = 512, bandwidth_mbps: float = 100.0,
+                 lazy_reasoning: bool = False) -> None:
         self.complexity_analyzer = ComplexityAnalyzer()
         self.darpa_integrator = DARPAToolIntegrator(enabled=darpa_enabled)
         self.device_cache: Optional[DeviceCapability] = None
         self.connectivity_cache: Optional[ConnectivityStatus] = None
         self.cache_ttl = cache_ttl
-        self._last_device_check = None
-        self._last_connectivity_check = None
+        # Epochs advance only when a refresh changes a snapshot's signature, so
+        # cached decisions outlive probes that would not change them
+        self._device_epoch = 0
+        self._connectivity_epoch = 0
+        self._device_signature: Optional[Tuple[bool, bool, bool, int, int]] = None
+        self._connectivity_signature: Optional[Tuple[bool, str]] = None
+        self.decision_cache_size = decision_cache_size
+        self._decision_cache: "OrderedDict[Tuple[str, str, Optional[ExecutionMode], int, int], RoutingDecision]" = OrderedDict()
+        self.bandwidth_mbps = bandwidth_mbps
+        # Leave RoutingDecision.reasoning unset until build_reasoning() is called
+        self.lazy_reasoning = lazy_reasoning
+        self._refresh_lock = threading.Lock()
+        self._stop_refresh = threading.Event()
+        
+        # With hyperscan, complexity and security patterns share a single scan:
+        # slot 0 reports the complexity level, slot 1 the security severity
+        self._fused_scan: Optional[_HyperscanMatcher] = None
+        if self.darpa_integrator.enabled:
+            complexity_patterns = self.complexity_analyzer._residual
+            darpa = self.darpa_integrator
+            self._fused_scan = _hyperscan_matcher(
+                [pattern for pattern, _ in complexity_patterns]
+                + darpa.critical_patterns + darpa.elevated_patterns,
+                [level for _, level in complexity_patterns]
+                + [2] * len(darpa.critical_patterns) + [1] * len(darpa.elevated_patterns),
+                [0] * len(complexity_patterns)
+                + [1] * (len(darpa.critical_patterns) + len(darpa.elevated_patterns))
+            )
+        
+        self._start_background_refresh()
         
         logger.info("Smart Router initialized")
     
+    def _start_background_refresh(self) -> None:
+        """Start background thread keeping device and connectivity snapshots fresh"""
+        def refresh_worker() -> None:
+            while True:
+                try:
+                    self._refresh_device_capability()
+                    self._refresh_connectivity_status()
+                except Exception as e:
+                    logger.error(f"Probe refresh error: {e}")
+                if self._stop_refresh.wait(self.cache_ttl):
+                    return
+        
+        thread = threading.Thread(target=refresh_worker, daemon=True)
+        thread.start()
+    
+    def shutdown(self) -> None:
+        """Stop the background probe refresher"""
+        self._stop_refresh.set()
+    
+    def _refresh_device_capability(self) -> DeviceCapability:
+        """Probe device capabilities and publish a new snapshot"""
+        device = DeviceCapability.detect()
+        signature = _device_signature(device)
+        with self._refresh_lock:
+            self.device_cache = device
+            if signature != self._device_signature:
+                self._device_signature = signature
+                self._device_epoch += 1
+        return device
+    
+    def _refresh_connectivity_status(self) -> ConnectivityStatus:
+        """Probe connectivity and publish a new snapshot"""
+        connectivity = ConnectivityStatus.check(self.bandwidth_mbps)
+        signature = _connectivity_signature(connectivity)
+        with self._refresh_lock:
+            self.connectivity_cache = connectivity
+            if signature != self._connectivity_signature:
+                self._connectivity_signature = signature
+                self._connectivity_epoch += 1
+        return connectivity
+    
     def _get_device_capability(self) -> DeviceCapability:
-        """Get cached device capabilities"""
-        if (self.device_cache is None or 
-            self._last_device_check is None or
-            (datetime.now() - self._last_device_check).seconds > self.cache_ttl):
-            self.device_cache = DeviceCapability.detect()
-            self._last_device_check = datetime.now()
-        return self.device_cache
+        """Get cached device capabilities (probes synchronously only before the first refresh)"""
+        device = self.device_cache
+        if device is None:
+            device = self._refresh_device_capability()
+        return device
     
     def _get_connectivity_status(self) -> ConnectivityStatus:
-        """Get cached connectivity status"""
-        if (self.connectivity_cache is None or
-            self._last_connectivity_check is None or
-            (datetime.now() - self._last_connectivity_check).seconds > self.cache_ttl):
-            self.connectivity_cache = ConnectivityStatus.check()
-            self._last_connectivity_check = datetime.now()
-        return self.connectivity_cache
+        """Get cached connectivity status (probes synchronously only before the first refresh)"""
+        connectivity = self.connectivity_cache
+        if connectivity is None:
+            connectivity = self._refresh_connectivity_status()
+        return connectivity
     
     def route(self, query: str, operation: str = "general",
               user_preference: Optional[ExecutionMode] = None) -> RoutingDecision:
@@ -415,11 +824,106 @@ class SmartRouter:
         Returns:
             Complete routing decision with rationale
         """
+        # Epochs are read before the snapshots: a refresh in between only files
+        # the decision under a key that will never be looked up again
+        epochs = (self._device_epoch, self._connectivity_epoch)
         device = self._get_device_capability()
         connectivity = self._get_connectivity_status()
-        complexity, confidence = self.complexity_analyzer.analyze(query)
-        security_level = self.darpa_integrator.assess_security_level(operation, query)
         
+        # Decisions are deterministic for a given query and device/network signature;
+        # a cached decision's reasoning keeps the readings of the snapshot it was built from
+        cache_key = (query, operation, user_preference) + epochs
+        cached = self._decision_cache.get(cache_key)
+        if cached is not None:
+            self._decision_cache.move_to_end(cache_key)
+            decision = replace(
+                cached,
+                fallback_chain=list(cached.fallback_chain),
+                reasoning=cached.reasoning.copy() if cached.reasoning is not None else None,
+                timestamp=datetime.now()
+            )
+            # replace() leaves init=False fields at their defaults
+            decision._reasoning_args = cached._reasoning_args
+            return decision
+        
+        complexity, security_level, confidence = self.scan(query, operation)
+        decision = self._build_decision(
+            query, user_preference, complexity, security_level, confidence,
+            device, connectivity, datetime.now()
+        )
+        
+        # Elevated/critical queries are re-assessed each time so every attempt is audited
+        if decision.security_level == SecurityLevel.STANDARD:
+            self._decision_cache[cache_key] = decision
+            while len(self._decision_cache) > self.decision_cache_size:
+                self._decision_cache.popitem(last=False)
+        
+        return decision
+    
+    def route_batch(self, queries: List[str], operation: str = "general",
+                    user_preference: Optional[ExecutionMode] = None) -> List[RoutingDecision]:
+        """
+        Route a batch of queries against a single device/network snapshot
+        
+        Args:
+            queries: The user queries
+            operation: Type of operation shared by the batch
+            user_preference: Optional user-specified execution mode
+            
+        Returns:
+            One routing decision per query, in input order
+        """
+        device = self._get_device_capability()
+        connectivity = self._get_connectivity_status()
+        timestamp = datetime.now()
+        build = self._build_decision
+        scan = self.scan
+        
+        return [
+            build(query, user_preference, *scan(query, operation),
+                  device, connectivity, timestamp)
+            for query in queries
+        ]
+    
+    def scan(self, query: str, operation: str = "general") -> Tuple[QueryComplexity, SecurityLevel, float]:
+        """
+        Classify a query's complexity and security level
+        
+        Uses one combined Hyperscan pass when available; the re engine reports
+        a single leftmost match per search, so it keeps one scan per bank.
+        
+        Args:
+            query: The user's query
+            operation: Type of operation
+            
+        Returns:
+            Tuple of (complexity level, security level, confidence score)
+        """
+        # Complexity patterns see the stripped query and security patterns the
+        # original, so only queries without surrounding whitespace share a pass
+        stripped = query.strip()
+        if self._fused_scan is None or len(stripped) != len(query):
+            complexity, confidence = self.complexity_analyzer.analyze(query)
+            security_level = self.darpa_integrator.assess_security_level(operation, query)
+            return complexity, security_level, confidence
+        
+        residual_level, severity = self._fused_scan.max_tags(query)
+        complexity, confidence = self.complexity_analyzer._analyze_normalized(
+            query.lower(), time.monotonic(), residual_level
+        )
+        security_level = self.darpa_integrator._assess_severity(operation, query, severity)
+        return complexity, security_level, confidence
+    
+    def _build_decision(self, query: str,
+                        user_preference: Optional[ExecutionMode],
+                        complexity: QueryComplexity,
+                        security_level: SecurityLevel,
+                        confidence: float,
+                        device: DeviceCapability,
+                        connectivity: ConnectivityStatus,
+                        timestamp: datetime) -> RoutingDecision:
+        """Assemble a routing decision for an analyzed query"""
+        reasoning: Optional[RoutingReasoning]
         if user_preference:
             mode = user_preference
             reasoning = {"source": "user_preference", "value": mode.value}
@@ -427,14 +931,17 @@ class SmartRouter:
             mode = self._determine_execution_mode(
                 complexity, device, connectivity, security_level
             )
-            reasoning = self._build_reasoning(complexity, device, connectivity, security_level)
+            reasoning = None if self.lazy_reasoning else self._build_reasoning(
+                complexity, device, connectivity, security_level
+            )
         
         model_size = self._select_model(complexity, device, security_level)
         fallback_chain = self._build_fallback_chain(mode, device, connectivity)
-        estimated_latency = self._estimate_latency(mode, complexity, query)
-        estimated_cost = self._estimate_cost(model_size, query)
+        word_count = len(query.split())
+        estimated_latency = self._estimate_latency(mode, complexity, word_count)
+        estimated_cost = self._estimate_cost(model_size, word_count)
         
-        return RoutingDecision(
+        decision = RoutingDecision(
             execution_mode=mode,
             model_size=model_size,
             complexity=complexity,
@@ -444,8 +951,11 @@ class SmartRouter:
             estimated_cost=estimated_cost,
             fallback_chain=fallback_chain,
             reasoning=reasoning,
-            timestamp=datetime.now()
+            timestamp=timestamp
         )
+        if reasoning is None:
+            decision._reasoning_args = (complexity, device, connectivity, security_level)
+        return decision
     
     def _determine_execution_mode(self, complexity: QueryComplexity,
                                    device: DeviceCapability,
@@ -477,28 +987,25 @@ class SmartRouter:
                       security_level: SecurityLevel) -> ModelSize:
         """Select optimal model size based on conditions"""
         
-        base_model = self.MODEL_REQUIREMENTS[complexity]
+        base_model = _COMPLEXITY_PROFILE[complexity][0]
         
         if security_level == SecurityLevel.CRITICAL:
             if device.ram_available_gb >= 68:
                 return ModelSize.XL_34B
         
-        if device.ram_available_gb < base_model.value["ram_gb"]:
-            for model in ModelSize:
-                if device.ram_available_gb >= model.value["ram_gb"]:
-                    return model
-            return ModelSize.NANO_1B
+        ram_available_gb = device.ram_available_gb
+        base_vram_gb = base_model.value.vram_gb
+        
+        if ram_available_gb < base_model.value.ram_gb:
+            return _largest_fitting_model(ram_available_gb)
         
-        if device.has_gpu and device.vram_available_gb >= base_model.value["vram_gb"]:
+        if device.has_gpu and device.vram_available_gb >= base_vram_gb:
             return base_model
         
-        if not device.has_gpu and base_model.value["vram_gb"] > 0:
-            smaller_models = [
-                ModelSize.NANO_1B, ModelSize.SMALL_3B, ModelSize.MEDIUM_7B
-            ]
-            for model in smaller_models:
-                if device.ram_available_gb >= model.value["ram_gb"]:
-                    return model
+        if not device.has_gpu and base_vram_gb > 0:
+            # CPU-only inference tops out at the 7B model
+            limit = min(_MODEL_RANK[base_model], _MODEL_RANK[ModelSize.MEDIUM_7B]) + 1
+            return _largest_fitting_model(ram_available_gb, limit)
         
         return base_model
     
@@ -528,37 +1035,23 @@ class SmartRouter:
     
     def _estimate_latency(self, mode: ExecutionMode,
                           complexity: QueryComplexity,
-                          query: str) -> float:
+                          word_count: int) -> float:
         """Estimate response latency in milliseconds"""
         
-        token_count = len(query.split()) * 1.3
-        baseline = self.LATENCY_BASELINE[mode]
-        
-        if mode == ExecutionMode.OFFLINE_LOCAL:
-            per_token_ms = 0.5
-        elif mode == ExecutionMode.HYBRID_LOCAL_FIRST:
-            per_token_ms = 0.8
-        elif mode == ExecutionMode.HYBRID_CLOUD_FIRST:
-            per_token_ms = 1.5
-        else:
-            per_token_ms = 2.0
+        baseline, per_token_ms = _LATENCY_PROFILE[mode]
         
-        complexity_multiplier = 1 + (complexity.value - 1) * 0.2
-        
-        return baseline + (token_count * per_token_ms * complexity_multiplier)
+        return baseline + (word_count * per_token_ms * _COMPLEXITY_PROFILE[complexity][1])
     
-    def _estimate_cost(self, model: ModelSize, query: str) -> float:
+    def _estimate_cost(self, model: ModelSize, word_count: int) -> float:
         """Estimate cost per query in USD"""
         
-        token_count = len(query.split()) * 1.3
-        base_cost = self.COST_PER_MODEL[model]
-        
-        return base_cost * (token_count / 1000)
+        return _COST_PER_WORD[model] * word_count
     
-    def _build_reasoning(self, complexity: QueryComplexity,
+    @staticmethod
+    def _build_reasoning(complexity: QueryComplexity,
                          device: DeviceCapability,
                          connectivity: ConnectivityStatus,
-                         security_level: SecurityLevel) -> Dict[str, Any]:
+                         security_level: SecurityLevel) -> RoutingReasoning:
         """Build detailed reasoning for routing decision"""
         
         return {
@@ -573,3 +1066,19 @@ class SmartRouter:
             "battery_percent": device.battery_percent,
             "is_metered": device.is_metered,
         }
+
+
+# Hot-path lookup tables folding the constants above, one table per enum:
+# ~1.3 tokens per word, and +20% latency per complexity level above TRIVIAL
+_TOKENS_PER_WORD: Final = 1.3
+_COMPLEXITY_PROFILE: Final[Dict[QueryComplexity, Tuple[ModelSize, float]]] = {
+    complexity: (SmartRouter.MODEL_REQUIREMENTS[complexity], 1 + (complexity.value - 1) * 0.2)
+    for complexity in QueryComplexity
+}
+_LATENCY_PROFILE: Final[Dict[ExecutionMode, Tuple[float, float]]] = {
+    mode: (SmartRouter.LATENCY_BASELINE[mode], SmartRouter.LATENCY_PER_TOKEN_MS[mode] * _TOKENS_PER_WORD)
+    for mode in ExecutionMode
+}
+_COST_PER_WORD: Final[Dict[ModelSize, float]] = {
+    model: cost * _TOKENS_PER_WORD / 1000 for model, cost in SmartRouter.COST_PER_MODEL.items()
+}
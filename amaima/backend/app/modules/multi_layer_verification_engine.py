@@ -5,17 +5,203 @@ Comprehensive output validation with DARPA security integration
 
 from enum import Enum
 from dataclasses import dataclass, field
-from typing import Optional, Dict, List, Tuple, Any, Callable
+from typing import Optional, Dict, List, Tuple, Any, Callable, Set, Deque
 from datetime import datetime
 import re
 import ast
+import copy
 import json
+import math
 import logging
-from collections import Counter
+import functools
+from bisect import bisect_left, bisect_right
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from operator import itemgetter
 
 logger = logging.getLogger(__name__)
 
 
+# Fixed patterns, compiled once at import
+_NUMBER_RE = re.compile(r"(-?\d+\.?\d*)\s*(°[CFcfa-z]+|%|km|m|s|ms|°|USD|EUR|GBP|million|billion|trillion)?")
+# Numeric domain implied by a unit captured by _NUMBER_RE; unitless numbers and
+# units without a known domain are not range-checked
+_UNIT_TO_DOMAIN = {
+    "°C": "temperature",
+    "°F": "temperature",
+    "°c": "temperature",
+    "°f": "temperature",
+    "°": "coordinates",
+    "%": "percentage",
+    "USD": "currency",
+    "EUR": "currency",
+    "GBP": "currency",
+    "ms": "latency_ms",
+}
+_NEWLINE_RE = re.compile("\n")
+# ASCII separators that re's Unicode \s matches but hyperscan's and re.ASCII's \s do not
+_UNICODE_SPACE_RE = re.compile("[\x1c-\x1f]")
+# Literal markers that make an output worth a security scan
+_CODE_MARKERS = ("def ", "class ", "import ", "from ")
+_DOUBLE_NEG_RE = re.compile(r'\b(is|are|was|were)\s+(not|never|no)\s+\w+ing\b')
+
+# SecurityScanner's fallback bank: (pattern, description, severity)
+_FALLBACK_PATTERNS = (
+    (r"os\.system\s*\(", "Command injection via os.system", "high"),
+    (r"subprocess\.", "Command injection via subprocess", "high"),
+    (r"eval\s*\(", "Code injection via eval", "critical"),
+    (r"exec\s*\(", "Code injection via exec", "critical"),
+    (r"pickle\.loads?", "Insecure deserialization", "high"),
+    (r"yaml\.load\s*\(", "YAML deserialization vulnerability", "medium"),
+    (r"sql\s+injection", "SQL injection vulnerability", "critical"),
+    (r"shell\s*=\s*True", "Shell injection vulnerability", "high"),
+    (r"password\s*=\s*[\"'][^\"']+[\"']", "Hardcoded password", "medium"),
+    (r"api[_-]?key\s*=\s*[\"'][^\"']+[\"']", "Hardcoded API key", "high"),
+)
+# Compiled case-insensitively, each with an re.ASCII twin that skips Unicode case
+# folding. The twin matches identically only on ASCII code free of \x1c-\x1f,
+# which the Unicode \s treats as whitespace
+_FALLBACK_RES = tuple(
+    (pattern, re.compile(pattern, re.IGNORECASE),
+     re.compile(pattern, re.IGNORECASE | re.ASCII), description, severity)
+    for pattern, description, severity in _FALLBACK_PATTERNS
+)
+
+
+# Below this many numeric sources the plain Python consensus is faster than
+# building an array and calling into the JIT kernel
+_NUMBA_MIN_SOURCES = 64
+
+
+def _numeric_consensus_py(values):
+    """Mean, population std dev and per-value z-scores (compiled with numba)"""
+    n = values.shape[0]
+    total = 0.0
+    for i in range(n):
+        total += values[i]
+    mean = total / n
+    
+    squares = 0.0
+    for i in range(n):
+        squares += (values[i] - mean) ** 2
+    std = (squares / n) ** 0.5
+    
+    z_scores = values * 0.0
+    if std > 0:
+        for i in range(n):
+            z_scores[i] = abs(values[i] - mean) / std
+    return mean, std, z_scores
+
+
+@functools.lru_cache(maxsize=None)
+def _numeric_consensus_kernel() -> Optional[Callable]:
+    """JIT-compiled consensus kernel, or None when numba is not installed"""
+    try:
+        from numba import njit
+    except ImportError:
+        return None
+    return njit(cache=True)(_numeric_consensus_py)
+
+
+def _numeric_consensus(values: List[Any]) -> Optional[Tuple[float, float, List[Dict[str, Any]]]]:
+    """
+    Numeric consensus over many values via the numba kernel
+    
+    Returns:
+        Tuple of (mean, std_dev, outliers), or None to use the Python path
+    """
+    if len(values) < _NUMBA_MIN_SOURCES:
+        return None
+    kernel = _numeric_consensus_kernel()
+    if kernel is None:
+        return None
+    
+    import numpy as np
+    mean, std_dev, z_scores = kernel(np.asarray(values, dtype=np.float64))
+    outliers = [
+        {"value": values[i], "z_score": float(z_scores[i])}
+        for i in np.flatnonzero(z_scores > 2.0)
+    ]
+    return float(mean), float(std_dev), outliers
+
+
+class _HyperscanPrescreen:
+    """Hyperscan database reporting which of its patterns occur in a text"""
+    
+    def __init__(self, hyperscan: Any, patterns: List[str], caseless: bool = False):
+        self._hyperscan = hyperscan
+        self._db = hyperscan.Database()
+        flags = hyperscan.HS_FLAG_SINGLEMATCH
+        if caseless:
+            flags |= hyperscan.HS_FLAG_CASELESS
+        self._db.compile(
+            expressions=[pattern.encode() for pattern in patterns],
+            ids=list(range(len(patterns))),
+            flags=[flags] * len(patterns)
+        )
+        # Scratch space is per scanning thread
+        self._local = threading.local()
+    
+    def matching(self, text: str) -> Optional[Set[int]]:
+        """
+        Indices of the patterns that match somewhere in text
+        
+        Returns None for non-ASCII text: hyperscan's word-boundary, word and space
+        classes are ASCII-only there while re's are Unicode-aware, so such text must
+        go through re. The same holds for text containing the separators
+        0x1C-0x1F, which re treats as whitespace even in ASCII text.
+        """
+        if not text.isascii() or _UNICODE_SPACE_RE.search(text):
+            return None
+        
+        scratch = getattr(self._local, "scratch", None)
+        if scratch is None:
+            scratch = self._local.scratch = self._hyperscan.Scratch(self._db)
+        
+        hits: Set[int] = set()
+        
+        def on_match(pattern_id, start, end, flags, context):
+            hits.add(pattern_id)
+        
+        self._db.scan(text.encode(), match_event_handler=on_match, scratch=scratch)
+        return hits
+
+
+def _build_prescreen(patterns: List[str], caseless: bool = False) -> Optional[_HyperscanPrescreen]:
+    """Hyperscan pre-screen for patterns, or None when hyperscan is unavailable"""
+    try:
+        import hyperscan
+    except ImportError:
+        return None
+    try:
+        return _HyperscanPrescreen(hyperscan, patterns, caseless)
+    except Exception as e:
+        logger.warning(f"Hyperscan compilation failed, using re engine: {e}")
+        return None
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_math(expression: str, names: frozenset):
+    """
+    Parse, whitelist and compile a math expression
+    
+    Args:
+        expression: Mathematical expression
+        names: Names the expression may reference
+        
+    Returns:
+        Code object for eval
+    """
+    tree = ast.parse(expression, "<string>", mode="eval")
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and node.id not in names:
+            raise NameError(f"name '{node.id}' is not defined")
+        if isinstance(node, ast.Attribute) and node.attr.startswith("_"):
+            raise NameError(f"attribute '{node.attr}' is not allowed")
+    return compile(tree, "<math>", "eval")
+
+
 class VerificationLevel(Enum):
     """Verification strictness levels"""
     NONE = 0
@@ -34,7 +220,34 @@ class ConfidenceLevel(Enum):
     VERY_HIGH = "very_high"
 
 
-@dataclass
+# Lower bounds of each level above VERY_LOW; a confidence on a bound belongs to
+# the higher level, hence bisect_right
+_CONFIDENCE_THRESHOLDS = (0.4, 0.6, 0.75, 0.9)
+_CONFIDENCE_LEVELS = (
+    ConfidenceLevel.VERY_LOW,
+    ConfidenceLevel.LOW,
+    ConfidenceLevel.MEDIUM,
+    ConfidenceLevel.HIGH,
+    ConfidenceLevel.VERY_HIGH,
+)
+
+
+# Wall-clock and monotonic readings taken together, to place monotonic stamps in wall time
+_CLOCK_ANCHOR_NS = (time.time_ns(), time.monotonic_ns())
+
+
+def _iso(monotonic_ns: int) -> str:
+    """ISO 8601 local wall-clock time for a time.monotonic_ns() reading"""
+    wall_ns, anchor_ns = _CLOCK_ANCHOR_NS
+    return datetime.fromtimestamp((wall_ns + monotonic_ns - anchor_ns) / 1e9).isoformat()
+
+
+# Slack for float reassociation when bounding the remaining layers' bonus, so
+# short-circuiting never rejects an output a full run would verify
+_SHORT_CIRCUIT_MARGIN = 1e-9
+
+
+@dataclass(slots=True)
 class ToolResult:
     """Tool execution result"""
     tool_name: str
@@ -46,7 +259,7 @@ class ToolResult:
     duration_ms: float
 
 
-@dataclass
+@dataclass(slots=True)
 class VerificationResult:
     """Complete verification result"""
     is_verified: bool
@@ -58,9 +271,15 @@ class VerificationResult:
     cross_references: Dict[str, Any]
     security_scan: Optional[Dict[str, Any]]
     timestamp: datetime
+    short_circuited: bool = False
+    
+    @property
+    def timestamp_iso(self) -> str:
+        """ISO 8601 form of timestamp, formatted on demand"""
+        return self.timestamp.isoformat()
 
 
-@dataclass
+@dataclass(slots=True)
 class VerificationConfig:
     """Verification configuration"""
     level: VerificationLevel
@@ -71,6 +290,8 @@ class VerificationConfig:
     hallucination_threshold: float = 0.3
     repetition_threshold: float = 0.3
     code_execution_timeout: float = 5.0
+    history_limit: int = 1000
+    short_circuit: bool = False
 
 
 class SchemaValidator:
@@ -85,6 +306,11 @@ class SchemaValidator:
             "list": list,
             "dict": dict
         }
+        # Compiled validators by schema identity, each entry holding the schema
+        # (so its id cannot be reused while cached) and a snapshot of its contents
+        # taken at compile time; a schema mutated since then compiles afresh
+        self._compiled: "OrderedDict[int, Tuple[Dict[str, Any], Dict[str, Any], Callable[[Any], List[str]]]]" = OrderedDict()
+        self.max_compiled = 128
     
     def validate(self, output: Any, schema: Dict[str, Any]) -> Tuple[bool, List[str]]:
         """
@@ -97,44 +323,70 @@ class SchemaValidator:
         Returns:
             Tuple of (is_valid, error_messages)
         """
-        errors = []
-        
-        if schema.get("required"):
-            for field_name in schema["required"]:
-                if field_name not in output:
-                    errors.append(f"Missing required field: {field_name}")
-        
-        if "properties" in schema:
-            for field_name, field_schema in schema["properties"].items():
+        errors = self._get_compiled(schema)(output)
+        return len(errors) == 0, errors
+    
+    def _get_compiled(self, schema: Dict[str, Any]) -> Callable[[Any], List[str]]:
+        """Get the compiled validator for schema, compiling it on first use"""
+        key = id(schema)
+        entry = self._compiled.get(key)
+        if entry is not None and entry[0] is schema and entry[1] == schema:
+            self._compiled.move_to_end(key)
+            return entry[2]
+        
+        compiled = self._compile(schema)
+        self._compiled[key] = (schema, copy.deepcopy(schema), compiled)
+        while len(self._compiled) > self.max_compiled:
+            self._compiled.popitem(last=False)
+        return compiled
+    
+    def _compile(self, schema: Dict[str, Any]) -> Callable[[Any], List[str]]:
+        """Compile a schema into a function returning the error messages for an output"""
+        required = tuple(schema["required"]) if schema.get("required") else ()
+        fields = tuple(
+            (field_name, self._compile_field(field_schema))
+            for field_name, field_schema in schema["properties"].items()
+        ) if "properties" in schema else ()
+        
+        def validate_output(output: Any) -> List[str]:
+            errors = [f"Missing required field: {field_name}"
+                      for field_name in required if field_name not in output]
+            for field_name, check_field in fields:
                 if field_name in output:
-                    field_value = output[field_name]
-                    field_errors = self._validate_field(field_value, field_schema)
-                    errors.extend(field_errors)
+                    errors.extend(check_field(output[field_name]))
+            return errors
         
-        return len(errors) == 0, errors
+        return validate_output
     
-    def _validate_field(self, value: Any, schema: Dict[str, Any]) -> List[str]:
-        """Validate individual field"""
-        errors = []
+    def _compile_field(self, schema: Dict[str, Any]) -> Callable[[Any], List[str]]:
+        """Compile a field schema into a function returning the error messages for a value"""
+        type_name = schema.get("type")
+        expected_type = self.type_mapping.get(type_name) if "type" in schema else None
+        has_min, min_value = "min" in schema, schema.get("min")
+        has_max, max_value = "max" in schema, schema.get("max")
+        pattern = schema.get("pattern") if "pattern" in schema else None
+        match: Optional[Callable[[str], Any]] = None
+        if pattern is not None:
+            try:
+                match = re.compile(pattern).match
+            except re.error:
+                # Surface the invalid pattern when a value is checked, as before
+                match = lambda value: re.match(pattern, value)
         
-        if "type" in schema:
-            expected_type = self.type_mapping.get(schema["type"])
+        def check_field(value: Any) -> List[str]:
+            errors = []
             if expected_type and not isinstance(value, expected_type):
-                errors.append(f"Field type mismatch: expected {schema['type']}, got {type(value).__name__}")
-        
-        if "min" in schema and isinstance(value, (int, float)):
-            if value < schema["min"]:
-                errors.append(f"Value {value} below minimum {schema['min']}")
-        
-        if "max" in schema and isinstance(value, (int, float)):
-            if value > schema["max"]:
-                errors.append(f"Value {value} above maximum {schema['max']}")
-        
-        if "pattern" in schema and isinstance(value, str):
-            if not re.match(schema["pattern"], value):
-                errors.append(f"Value '{value}' does not match pattern {schema['pattern']}")
-        
-        return errors
+                errors.append(f"Field type mismatch: expected {type_name}, got {type(value).__name__}")
+            if isinstance(value, (int, float)):
+                if has_min and value < min_value:
+                    errors.append(f"Value {value} below minimum {min_value}")
+                if has_max and value > max_value:
+                    errors.append(f"Value {value} above maximum {max_value}")
+            if match is not None and isinstance(value, str) and not match(value):
+                errors.append(f"Value '{value}' does not match pattern {pattern}")
+            return errors
+        
+        return check_field
 
 
 class PlausibilityChecker:
@@ -176,6 +428,18 @@ class PlausibilityChecker:
             r"yaml\.load\s*\(",
             r"__import__\s*\(",
         ]
+        
+        self._hallucination_res = tuple(
+            (pattern, re.compile(pattern)) for pattern in self.hallucination_patterns
+        )
+        self._dangerous_res = tuple(
+            (pattern, re.compile(pattern)) for pattern in self.dangerous_patterns
+        )
+        
+        # With hyperscan, one pass over the lowercased output finds which patterns
+        # can match (the dangerous patterns are all lowercase, so this over-approximates
+        # their case-sensitive search); re then only runs for those to extract the match
+        self._prescreen = _build_prescreen(self.hallucination_patterns + self.dangerous_patterns)
     
     def check(self, output: str, context: Optional[Dict] = None) -> Dict[str, Any]:
         """
@@ -197,16 +461,19 @@ class PlausibilityChecker:
             "confidence_impact": 0.0
         }
         
+        output_lower = output.lower()
+        hits = self._prescreen.matching(output_lower) if self._prescreen is not None else None
+        
         numeric_results = self._check_numeric_values(output)
         results["numeric_validations"] = numeric_results
         
-        hallucination_results = self._check_hallucinations(output)
+        hallucination_results = self._check_hallucinations(output_lower, hits)
         results["hallucination_flags"] = hallucination_results
         
-        repetition_results = self._check_repetition(output)
+        repetition_results = self._check_repetition(output_lower)
         results["repetition_issues"] = repetition_results
         
-        code_results = self._check_code_safety(output)
+        code_results = self._check_code_safety(output, hits)
         results["code_safety"] = code_results
         
         confidence_impact = 0.0
@@ -214,7 +481,7 @@ class PlausibilityChecker:
         confidence_impact -= len([r for r in repetition_results if r["detected"]]) * 0.1
         confidence_impact -= len([r for r in code_results if r["detected"]]) * 0.2
         
-        if not all(r["valid"] for r in numeric_results):
+        if numeric_results:
             confidence_impact -= 0.1
         
         results["confidence_impact"] = max(-0.5, min(0.0, confidence_impact))
@@ -223,33 +490,33 @@ class PlausibilityChecker:
         return results
     
     def _check_numeric_values(self, output: str) -> List[Dict[str, Any]]:
-        """Check numeric values for plausibility"""
+        """Check numeric values against the domain implied by their unit; returns the violations"""
         results = []
-        number_pattern = r"(-?\d+\.?\d*)\s*(°[CFcfa-z]+|%|km|m|s|ms|°|USD|EUR|GBP|million|billion|trillion)?"
         
-        for match in re.finditer(number_pattern, output):
-            value = float(match.group(1))
-            unit = match.group(2) or ""
+        for match in _NUMBER_RE.finditer(output):
+            domain = _UNIT_TO_DOMAIN.get(match.group(2))
+            if domain is None:
+                continue
             
-            for domain, range_spec in self.numeric_domains.items():
-                in_range = range_spec["min"] <= value <= range_spec["max"]
+            value = float(match.group(1))
+            range_spec = self.numeric_domains[domain]
+            if not range_spec["min"] <= value <= range_spec["max"]:
                 results.append({
                     "value": value,
-                    "unit": unit,
+                    "unit": match.group(2),
                     "domain": domain,
-                    "valid": in_range,
+                    "valid": False,
                     "range": range_spec
                 })
         
         return results
     
-    def _check_hallucinations(self, output: str) -> List[Dict[str, Any]]:
-        """Detect potential hallucination markers"""
+    def _check_hallucinations(self, output_lower: str, hits: Optional[Set[int]] = None) -> List[Dict[str, Any]]:
+        """Detect potential hallucination markers in lowercased output (hits: pre-screened pattern indices)"""
         results = []
-        output_lower = output.lower()
         
-        for i, pattern in enumerate(self.hallucination_patterns):
-            match = re.search(pattern, output_lower)
+        for i, (pattern, compiled) in enumerate(self._hallucination_res):
+            match = compiled.search(output_lower) if hits is None or i in hits else None
             results.append({
                 "pattern": pattern,
                 "detected": match is not None,
@@ -258,15 +525,19 @@ class PlausibilityChecker:
         
         return results
     
-    def _check_repetition(self, output: str) -> List[Dict[str, Any]]:
-        """Check for excessive repetition"""
-        words = output.lower().split()
+    def _check_repetition(self, output_lower: str) -> List[Dict[str, Any]]:
+        """Check lowercased output for excessive repetition"""
+        words = output_lower.split()
         if len(words) < 10:
             return []
         
         word_counts = Counter(words)
         total_words = len(words)
         
+        # Common case: even the most frequent word stays under the threshold
+        if max(word_counts.values()) / total_words <= 0.3:
+            return []
+        
         repetitions = []
         for word, count in word_counts.items():
             if count > 1:
@@ -281,12 +552,13 @@ class PlausibilityChecker:
         
         return repetitions
     
-    def _check_code_safety(self, output: str) -> List[Dict[str, Any]]:
-        """Check for dangerous code patterns"""
+    def _check_code_safety(self, output: str, hits: Optional[Set[int]] = None) -> List[Dict[str, Any]]:
+        """Check for dangerous code patterns (hits: pre-screened pattern indices)"""
         results = []
+        offset = len(self._hallucination_res)
         
-        for i, pattern in enumerate(self.dangerous_patterns):
-            match = re.search(pattern, output)
+        for i, (pattern, compiled) in enumerate(self._dangerous_res, offset):
+            match = compiled.search(output) if hits is None or i in hits else None
             results.append({
                 "pattern": pattern,
                 "detected": match is not None,
@@ -300,11 +572,19 @@ class PlausibilityChecker:
 class SecurityScanner:
     """DARPA-grade security scanning integration"""
     
-    def __init__(self, enabled: bool = True):
+    def __init__(self, enabled: bool = True, history_limit: int = 1000):
         self.enabled = enabled
-        self.scan_history: List[Dict] = []
+        # Most recent scans only; the oldest are dropped past history_limit
+        self.scan_history: Deque[Dict] = deque(maxlen=history_limit)
         self.buttercup_available = False
         self.sweetbaby_available = False
+        # DARPA entry points, resolved once by _initialize_tools
+        self._scan_code: Optional[Callable] = None
+        self._auto_patch: Optional[Callable] = None
+        # Fallback patterns that can match are found in one hyperscan pass
+        self._prescreen = _build_prescreen(
+            [pattern for pattern, _, _ in _FALLBACK_PATTERNS], caseless=True
+        )
         self._initialize_tools()
     
     def _initialize_tools(self):
@@ -314,7 +594,10 @@ class SecurityScanner:
             return
         
         try:
-            from darpa_tools import buttercup, sweetbaby
+            from darpa_tools.buttercup import scan_code
+            from darpa_tools.sweetbaby import auto_patch
+            self._scan_code = scan_code
+            self._auto_patch = auto_patch
             self.buttercup_available = True
             self.sweetbaby_available = True
             logger.info("DARPA security tools initialized")
@@ -335,15 +618,14 @@ class SecurityScanner:
         result = {
             "vulnerabilities": [],
             "risk_score": 0.0,
-            "scan_time": datetime.now().isoformat(),
+            "scan_time_ns": time.monotonic_ns(),
             "tools_used": [],
             "auto_patches": []
         }
         
-        if self.buttercup_available:
+        if self._scan_code is not None:
             try:
-                from darpa_tools.buttercup import scan_code
-                vulnerabilities = scan_code(code)
+                vulnerabilities = self._scan_code(code)
                 result["vulnerabilities"] = vulnerabilities
                 result["tools_used"].append("buttercup")
             except Exception as e:
@@ -359,10 +641,9 @@ class SecurityScanner:
         
         result["risk_score"] = min(risk_score, 1.0)
         
-        if self.sweetbaby_available and result["vulnerabilities"]:
+        if self._auto_patch is not None and result["vulnerabilities"]:
             try:
-                from darpa_tools.sweetbaby import auto_patch
-                patched_code, patches = auto_patch(code, result["vulnerabilities"])
+                patched_code, patches = self._auto_patch(code, result["vulnerabilities"])
                 result["auto_patches"] = patches
                 result["patched_code"] = patched_code
             except Exception as e:
@@ -372,27 +653,28 @@ class SecurityScanner:
         
         return result
     
+    def get_scan_history(self) -> List[Dict[str, Any]]:
+        """Recorded scans, oldest first, each with its scan_time as local ISO 8601"""
+        return [{**scan, "scan_time": _iso(scan["scan_time_ns"])} for scan in self.scan_history]
+    
     def _fallback_scan(self, code: str) -> List[Dict[str, Any]]:
         """Fallback security scan when DARPA tools unavailable"""
         vulnerabilities = []
-        
-        dangerous_patterns = [
-            (r"os\.system\s*\(", "Command injection via os.system", "high"),
-            (r"subprocess\.", "Command injection via subprocess", "high"),
-            (r"eval\s*\(", "Code injection via eval", "critical"),
-            (r"exec\s*\(", "Code injection via exec", "critical"),
-            (r"pickle\.loads?", "Insecure deserialization", "high"),
-            (r"yaml\.load\s*\(", "YAML deserialization vulnerability", "medium"),
-            (r"sql\s+injection", "SQL injection vulnerability", "r"shellcritical"),
-            (=True", "Shell injection vulnerability", "high"),
-            (r"password\s*=\s*[\"'][^\"']+[\"']", "Hardcoded password", "medium"),
-            (r"api[_-]?key\s*=\s*[\"'][^\"']+[\"']", "Hardcoded API key", "high"),
-        ]
-        
-        for pattern, description, severity in dangerous_patterns:
-            matches = re.finditer(pattern, code, re.IGNORECASE)
-            for match in matches:
-                line_no = code[:match.start()].count('\n') + 1
+        hits = self._prescreen.matching(code) if self._prescreen is not None else None
+        
+        # Offsets of every newline, built on the first match; a match's line is
+        # one more than the number of newlines before it
+        newlines: Optional[List[int]] = None
+        ascii_only = code.isascii() and not _UNICODE_SPACE_RE.search(code)
+        
+        for i, (pattern, compiled, compiled_ascii, description, severity) in enumerate(_FALLBACK_RES):
+            if hits is not None and i not in hits:
+                continue
+            regex = compiled_ascii if ascii_only else compiled
+            for match in regex.finditer(code):
+                if newlines is None:
+                    newlines = [m.start() for m in _NEWLINE_RE.finditer(code)]
+                line_no = bisect_left(newlines, match.start()) + 1
                 vulnerabilities.append({
                     "type": description,
                     "severity": severity,
@@ -414,6 +696,10 @@ class CodeExecutionVerifier:
             'isqrt', 'factorial', 'degrees', 'radians'
         }
         self.math_execution_count = 0
+        self._math_ns = {k: getattr(math, k) for k in self.allowed_functions
+                         if hasattr(math, k)}
+        self._math_names = frozenset(self._math_ns)
+        self._math_ns["__builtins__"] = {}
     
     def verify_math(self, expression: str, expected_result: float,
                     tolerance: float = 0.01) -> Dict[str, Any]:
@@ -431,10 +717,8 @@ class CodeExecutionVerifier:
         self.math_execution_count += 1
         
         try:
-            import math
-            result = eval(expression, {"__builtins__": {}}, {k: getattr(math, k) 
-                                                           for k in self.allowed_functions 
-                                                           if hasattr(math, k)})
+            # Fresh locals so an assignment expression cannot rebind the shared names
+            result = eval(_compile_math(expression, self._math_names), self._math_ns, {})
             
             abs_error = abs(result - expected_result)
             rel_error = abs_error / abs(expected_result) if expected_result != 0 else abs_error
@@ -503,11 +787,12 @@ class LLMCritic:
             confidence_adjustment -= 0.1
             issues.append("All caps detected - may indicate low quality")
         
-        if "sorry" in output.lower() or "apologies" in output.lower():
+        output_lower = output.lower()
+        if "sorry" in output_lower or "apologies" in output_lower:
             confidence_adjustment -= 0.05
             issues.append("Excessive apologetic language")
         
-        if re.search(r'\b(is|are|was|were)\s+(not|never|no)\s+\w+ing\b', output.lower()):
+        if _DOUBLE_NEG_RE.search(output_lower):
             confidence_adjustment -= 0.02
             issues.append("Double negative detected")
         
@@ -523,8 +808,8 @@ class LLMCritic:
 class CrossReferenceValidator:
     """Multi-source cross-reference validation"""
     
-    def __init__(self):
-        self.validation_history: List[Dict] = []
+    def __init__(self, history_limit: int = 1000):
+        self.validation_history: Deque[Dict] = deque(maxlen=history_limit)
     
     def validate_consensus(self, sources: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -558,25 +843,30 @@ class CrossReferenceValidator:
         
         if categorical_sources:
             value_counts = Counter(s.get("value") for s in categorical_sources)
-            most_common_count = max(value_counts.values())
+            # Single pass; ties go to the first value seen, as with most_common(1)
+            majority_vote, most_common_count = max(value_counts.items(), key=itemgetter(1))
             agreement = most_common_count / len(categorical_sources)
             result["categorical_agreement"] = agreement
-            result["majority_vote"] = value_counts.most_common(1)[0][0]
+            result["majority_vote"] = majority_vote
         
         if numeric_sources:
             values = [s.get("value") for s in numeric_sources]
-            mean_val = sum(values) / len(values)
-            variance = sum((v - mean_val) ** 2 for v in values) / len(values)
-            std_dev = variance ** 0.5
-            
-            outliers = []
-            for s in numeric_sources:
-                z_score = abs(s.get("value") - mean_val) / std_dev if std_dev > 0 else 0
-                if z_score > 2.0:
-                    outliers.append({
-                        "value": s.get("value"),
-                        "z_score": z_score
-                    })
+            consensus = _numeric_consensus(values)
+            if consensus is not None:
+                mean_val, std_dev, outliers = consensus
+            else:
+                mean_val = sum(values) / len(values)
+                variance = sum((v - mean_val) ** 2 for v in values) / len(values)
+                std_dev = variance ** 0.5
+                
+                outliers = []
+                for s in numeric_sources:
+                    z_score = abs(s.get("value") - mean_val) / std_dev if std_dev > 0 else 0
+                    if z_score > 2.0:
+                        outliers.append({
+                            "value": s.get("value"),
+                            "z_score": z_score
+                        })
             
             result["numeric_mean"] = mean_val
             result["numeric_std_dev"] = std_dev
@@ -595,20 +885,46 @@ class IntegratedVerificationEngine:
     Main verification engine coordinating all validation layers
     """
     
-    def __init__(, config: Optional[VerificationConfig] = None):
+    def __init__(self, config: Optional[VerificationConfig] = None):
         self.config = config or VerificationConfig(
             level=VerificationLevel.STANDARD,
             enabled_layers=["schema", "plausibility", "cross_reference", "llm_critique"],
             confidence_threshold=0.7,
             enable_security_scan=True
         )
-        
-        self.schema_validator = SchemaValidator()
-        self.plausibility_checker = PlausibilityChecker()
-        self.security_scanner = SecurityScanner(enabled=self.config.enable_security_scan)
-        self.code_verifier = CodeExecutionVerifier()
-        self.llm_critic = LLMCritic()
-        self.cross_validator = CrossReferenceValidator()
+        # Layers are fixed at construction; validators are built on first use
+        self._enabled = frozenset(self.config.enabled_layers)
+        selected = self._select_layers()
+        self._layers = tuple(layer for layer, _ in selected)
+        # Most confidence the layers after each position can still add
+        self._max_remaining = tuple(
+            sum(bonus for _, bonus in selected[i + 1:]) for i in range(len(selected))
+        )
+    
+    @functools.cached_property
+    def schema_validator(self) -> SchemaValidator:
+        return SchemaValidator()
+    
+    @functools.cached_property
+    def plausibility_checker(self) -> PlausibilityChecker:
+        return PlausibilityChecker()
+    
+    @functools.cached_property
+    def security_scanner(self) -> SecurityScanner:
+        return SecurityScanner(enabled=self.config.enable_security_scan,
+                               history_limit=self.config.history_limit)
+    
+    @functools.cached_property
+    def code_verifier(self) -> CodeExecutionVerifier:
+        return CodeExecutionVerifier()
+    
+    @functools.cached_property
+    def llm_critic(self) -> LLMCritic:
+        return LLMCritic()
+    
+    @functools.cached_property
+    def cross_validator(self) -> CrossReferenceValidator:
+        return CrossReferenceValidator(history_limit=self.config.history_limit)
     
     def verify(self, output: Any, context: Optional[Dict] = None,
                tool_results: Optional[List[ToolResult]] = None) -> VerificationResult:
@@ -623,64 +939,64 @@ class IntegratedVerificationEngine:
         Returns:
             Complete verification result
         """
+        return self._verify(output, context, tool_results, datetime.now())
+    
+    def verify_batch(self, outputs: List[Any], contexts: Optional[List[Optional[Dict]]] = None,
+                     tool_results_list: Optional[List[Optional[List[ToolResult]]]] = None
+                     ) -> List[VerificationResult]:
+        """
+        Verify a batch of outputs with one shared timestamp
+        
+        Args:
+            outputs: Outputs to verify
+            contexts: Optional per-output contexts, aligned with outputs
+            tool_results_list: Optional per-output tool results, aligned with outputs
+            
+        Returns:
+            One verification result per output, in input order
+        """
+        count = len(outputs)
+        if contexts is None:
+            contexts = [None] * count
+        if tool_results_list is None:
+            tool_results_list = [None] * count
+        if len(contexts) != count or len(tool_results_list) != count:
+            raise ValueError("contexts and tool_results_list must align with outputs")
+        
+        timestamp = datetime.now()
+        verify = self._verify
+        
+        return [
+            verify(output, context, tool_results, timestamp)
+            for output, context, tool_results in zip(outputs, contexts, tool_results_list)
+        ]
+    
+    def _verify(self, output: Any, context: Optional[Dict],
+                tool_results: Optional[List[ToolResult]], timestamp: datetime) -> VerificationResult:
+        """Run the enabled layers over one output; timestamp is stamped on the result"""
         layer_results = {}
         total_confidence = 1.0
         all_issues = []
         
-        if "schema" in self.config.enabled_layers:
-            if isinstance(output, dict) and context and context.get("expected_schema"):
-                schema_valid, schema_errors = self.schema_validator.validate(
-                    output, context["expected_schema"]
-                )
-                layer_results["schema"] = {
-                    "passed": schema_valid,
-                    "errors": schema_errors,
-                    "confidence_impact": 0.0 if schema_valid else -0.15
-                }
-                if not schema_valid:
-                    total_confidence -= 0.15
-                    all_issues.extend([{"layer": "schema", "error": e} for e in schema_errors])
-        
-        if "plausibility" in self.config.enabled_layers:
-            if isinstance(output, str):
-                plausibility_results = self.plausibility_checker.check(output, context)
-                layer_results["plausibility"] = plausibility_results
-                total_confidence += plausibility_results.get("confidence_impact", 0)
-                if not plausibility_results.get("is_plausible"):
-                    issues = plausibility_results.get("hallucination_flags", []) + \
-                            plausibility_results.get("repetition_issues", [])
-                    all_issues.extend([{"layer": "plausibility", "issue": i} for i in issues if i.get("detected")])
-        
-        if "security" in self.config.enabled_layers and self.config.enable_security_scan:
-            if isinstance(output, str) and len(output) > 50:
-                is_code = any(keyword in output for keyword in ["def ", "class ", "import ", "from "])
-                if is_code:
-                    security_result = self.security_scanner.scan(output)
-                    layer_results["security"] = {
-                        "passed": security_result["risk_score"] < 0.5,
-                        "risk_score": security_result["risk_score"],
-                        "vulnerabilities": security_result["vulnerabilities"],
-                        "confidence_impact": -security_result["risk_score"] * 0.3
-                    }
-                    total_confidence += layer_results["security"]["confidence_impact"]
-                    all_issues.extend([
-                        {"layer": "security", "vulnerability": v}
-                        for v in security_result["vulnerabilities"]
-                    ])
-        
-        if "cross_reference" in self.config.enabled_layers and tool_results:
-            cross_result = self.cross_validator.validate_consensus([
-                {"value": tr.output, "tool": tr.tool_name}
-                for tr in tool_results if tr.success
-            ])
-            layer_results["cross_reference"] = cross_result
-            total_confidence += (cross_result["confidence"] - 0.7) * 0.2
-        
-        if "llm_critique" in self.config.enabled_layers and self.config.enable_llm_critique:
-            if isinstance(output, str):
-                critique_result = self.llm_critic.critique(output, context)
-                layer_results["llm_critique"] = critique_result
-                total_confidence += (critique_result["confidence"] - self.llm_critic.baseline_confidence)
+        short_circuited = False
+        
+        if self.config.short_circuit:
+            # Stop once even the best case for the remaining layers misses the threshold
+            historical = self._calculate_historical_accuracy(tool_results) if tool_results else None
+            threshold = self.config.confidence_threshold - _SHORT_CIRCUIT_MARGIN
+            last = len(self._layers) - 1
+            for i, layer in enumerate(self._layers):
+                total_confidence += layer(output, context, tool_results, layer_results, all_issues)
+                if i < last:
+                    best = min(1.0, total_confidence + self._max_remaining[i])
+                    if historical is not None:
+                        best = best * 0.7 + historical * 0.3
+                    if best < threshold:
+                        short_circuited = True
+                        break
+        else:
+            for layer in self._layers:
+                total_confidence += layer(output, context, tool_results, layer_results, all_issues)
         
         total_confidence = max(0.0, min(1.0, total_confidence))
         
@@ -700,9 +1016,115 @@ class IntegratedVerificationEngine:
             recommendations=recommendations,
             cross_references=layer_results.get("cross_reference", {}),
             security_scan=layer_results.get("security", {}),
-            timestamp=datetime.now()
+            timestamp=timestamp,
+            short_circuited=short_circuited
         )
     
+    def _select_layers(self) -> List[Tuple[Callable[..., float], float]]:
+        """
+        Resolve the configured layers once, in verification order
+        
+        Each layer takes (output, context, tool_results, layer_results, issues),
+        records its result and issues in place and returns its confidence delta.
+        
+        Returns:
+            List of (layer, largest positive delta it can return)
+        """
+        candidates = (
+            ("schema", self._schema_layer, True, 0.0),
+            ("plausibility", self._plausibility_layer, True, 0.0),
+            ("security", self._security_layer, self.config.enable_security_scan, 0.0),
+            # Consensus confidence is capped at 1.0
+            ("cross_reference", self._cross_reference_layer, True, (1.0 - 0.7) * 0.2),
+            ("llm_critique", self._llm_critique_layer, self.config.enable_llm_critique, 0.0),
+        )
+        return [
+            (layer, bonus) for name, layer, allowed, bonus in candidates
+            if allowed and name in self._enabled
+        ]
+    
+    def _schema_layer(self, output: Any, context: Optional[Dict],
+                      tool_results: Optional[List[ToolResult]],
+                      layer_results: Dict, issues: List[Dict]) -> float:
+        """Validate dict outputs against the context's expected schema"""
+        if not (isinstance(output, dict) and context and context.get("expected_schema")):
+            return 0.0
+        
+        schema_valid, schema_errors = self.schema_validator.validate(
+            output, context["expected_schema"]
+        )
+        layer_results["schema"] = {
+            "passed": schema_valid,
+            "errors": schema_errors,
+            "confidence_impact": 0.0 if schema_valid else -0.15
+        }
+        if schema_valid:
+            return 0.0
+        issues.extend([{"layer": "schema", "error": e} for e in schema_errors])
+        return -0.15
+    
+    def _plausibility_layer(self, output: Any, context: Optional[Dict],
+                            tool_results: Optional[List[ToolResult]],
+                            layer_results: Dict, issues: List[Dict]) -> float:
+        """Plausibility checks for text outputs"""
+        if not isinstance(output, str):
+            return 0.0
+        
+        plausibility_results = self.plausibility_checker.check(output, context)
+        layer_results["plausibility"] = plausibility_results
+        if not plausibility_results.get("is_plausible"):
+            flagged = plausibility_results.get("hallucination_flags", []) + \
+                    plausibility_results.get("repetition_issues", [])
+            issues.extend([{"layer": "plausibility", "issue": i} for i in flagged if i.get("detected")])
+        return plausibility_results.get("confidence_impact", 0)
+    
+    def _security_layer(self, output: Any, context: Optional[Dict],
+                        tool_results: Optional[List[ToolResult]],
+                        layer_results: Dict, issues: List[Dict]) -> float:
+        """Security scan for text outputs that look like code"""
+        if not (isinstance(output, str) and len(output) > 50):
+            return 0.0
+        if not any(keyword in output for keyword in _CODE_MARKERS):
+            return 0.0
+        
+        security_result = self.security_scanner.scan(output)
+        layer_results["security"] = {
+            "passed": security_result["risk_score"] < 0.5,
+            "risk_score": security_result["risk_score"],
+            "vulnerabilities": security_result["vulnerabilities"],
+            "confidence_impact": -security_result["risk_score"] * 0.3
+        }
+        issues.extend([
+            {"layer": "security", "vulnerability": v}
+            for v in security_result["vulnerabilities"]
+        ])
+        return layer_results["security"]["confidence_impact"]
+    
+    def _cross_reference_layer(self, output: Any, context: Optional[Dict],
+                               tool_results: Optional[List[ToolResult]],
+                               layer_results: Dict, issues: List[Dict]) -> float:
+        """Consensus across successful tool results"""
+        if not tool_results:
+            return 0.0
+        
+        cross_result = self.cross_validator.validate_consensus([
+            {"value": tr.output, "tool": tr.tool_name}
+            for tr in tool_results if tr.success
+        ])
+        layer_results["cross_reference"] = cross_result
+        return (cross_result["confidence"] - 0.7) * 0.2
+    
+    def _llm_critique_layer(self, output: Any, context: Optional[Dict],
+                            tool_results: Optional[List[ToolResult]],
+                            layer_results: Dict, issues: List[Dict]) -> float:
+        """Heuristic critique of text outputs"""
+        if not isinstance(output, str):
+            return 0.0
+        
+        critique_result = self.llm_critic.critique(output, context)
+        layer_results["llm_critique"] = critique_result
+        return critique_result["confidence"] - self.llm_critic.baseline_confidence
+    
     def _calculate_historical_accuracy(self, tool_results: List[ToolResult]) -> float:
         """Calculate historical accuracy from tool results"""
         successful = [tr for tr in tool_results if tr.success]
@@ -712,15 +1134,7 @@ class IntegratedVerificationEngine:
     
     def _get_confidence_level(self, confidence: float) -> ConfidenceLevel:
         """Convert numeric confidence to enum level"""
-        if confidence >= 0.9:
-            return ConfidenceLevel.VERY_HIGH
-        elif confidence >= 0.75:
-            return ConfidenceLevel.HIGH
-        elif confidence >= 0.6:
-            return ConfidenceLevel.MEDIUM
-        elif confidence >= 0.4:
-            return ConfidenceLevel.LOW
-        return ConfidenceLevel.VERY_LOW
+        return _CONFIDENCE_LEVELS[bisect_right(_CONFIDENCE_THRESHOLDS, confidence)]
     
     def _generate_recommendations(self, layer_results: Dict) -> List[str]:
         """Generate actionable recommendations"""
@@ -3,15 +3,38 @@ AMAIMA Part V - Observability and Monitoring Framework
 Comprehensive logging, metrics, and tracing
 """
 
+import atexit
+import inspect
 import logging
+import queue
+import re
+import sys
 import time
 import json
-from datetime import datetime
-from typing import Dict, Any, Optional, Callable
-from functools import wraps
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from uuid import UUID
+from types import MappingProxyType
+from typing import Dict, Any, Optional, Callable, Mapping, Tuple, Deque, List
+from functools import lru_cache, wraps
+from collections import deque
 from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
 import threading
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 try:
     from prometheus_client import Counter, Histogram, Gauge, Summary, start_http_server
     PROMETHEUS_AVAILABLE = True
@@ -23,48 +46,241 @@ try:
     from opentelemetry.sdk.trace import TracerProvider
     from opentelemetry.sdk.metrics import MeterProvider
     from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    from opentelemetry.sdk.trace.sampling import ParentBasedTraceIdRatio
     from opentelemetry.sdk.metrics.export import ConsoleMetricExporter, PeriodicExportingMetricReader
     OPENTELEMETRY_AVAILABLE = True
 except ImportError:
     OPENTELEMETRY_AVAILABLE = False
 
 
+# Shared default for optional span/metric attributes; read-only so no caller
+# can leak entries into it
+_EMPTY_ATTRS: Mapping[str, Any] = MappingProxyType({})
+
+# Conversions for common non-JSON types, looked up along the value's MRO
+_JSON_DEFAULTS: Dict[type, Callable[[Any], Any]] = {
+    datetime: datetime.isoformat,
+    date: date.isoformat,
+    UUID: str,
+    Decimal: float,
+    Enum: lambda value: value.value,
+    set: list,
+    frozenset: list,
+    bytes: lambda value: value.decode("utf-8", "replace"),
+}
+
+
+def _json_default(value: Any) -> Any:
+    """Serializable stand-in for a value the encoder cannot handle"""
+    for cls in type(value).__mro__:
+        convert = _JSON_DEFAULTS.get(cls)
+        if convert is not None:
+            return convert(value)
+    # Pydantic models, e.g. request bodies passed as log extras
+    model_dump = getattr(value, "model_dump", None)
+    if callable(model_dump):
+        return model_dump(mode="json")
+    return str(value)
+
+
+def _stdlib_dumps(data: Any) -> str:
+    """Serialize a log record with the same compact layout as orjson"""
+    return json.dumps(data, separators=(",", ":"), default=_json_default)
+
+
+if ORJSON_AVAILABLE:
+    def _dumps(data: Any) -> str:
+        """Serialize a log record; orjson writes datetimes natively"""
+        return orjson.dumps(data, default=_json_default, option=orjson.OPT_NON_STR_KEYS).decode()
+else:
+    _dumps = _stdlib_dumps
+
+
+class _BoundedQueueHandler(QueueHandler):
+    """Queue handler that sheds DEBUG records once the backlog passes max_backlog"""
+    
+    def __init__(self, log_queue: queue.SimpleQueue, max_backlog: int):
+        super().__init__(log_queue)
+        self.max_backlog = max_backlog
+    
+    def enqueue(self, record: logging.LogRecord):
+        if record.levelno <= logging.DEBUG and self.queue.qsize() > self.max_backlog:
+            return
+        self.queue.put_nowait(record)
+
+
+class _BufStream:
+    """Text stream that batches writes into a byte buffer in front of a raw stream
+    
+    The buffer drains once it holds size bytes, on flush(), and from a
+    daemon thread every flush_interval_ms so short bursts are not held back.
+    """
+    
+    def __init__(self, raw, encoding: str, size: int = 8192, flush_interval_ms: int = 200):
+        self._raw = raw
+        self._encoding = encoding
+        self._buf = bytearray()
+        self._size = size
+        self._lock = threading.Lock()
+        self._interval = flush_interval_ms / 1000
+        self._flusher = threading.Thread(target=self._flush_idle, name="log-flush", daemon=True)
+        self._flusher.start()
+    
+    def write(self, text: str) -> int:
+        data = text.encode(self._encoding, "backslashreplace")
+        with self._lock:
+            self._buf += data
+            if len(self._buf) >= self._size:
+                self._drain()
+        return len(text)
+    
+    def flush(self):
+        with self._lock:
+            self._drain()
+    
+    def _drain(self):
+        if self._buf:
+            self._raw.write(self._buf)
+            self._raw.flush()
+            self._buf.clear()
+    
+    def _flush_idle(self):
+        while True:
+            time.sleep(self._interval)
+            if self._buf:
+                try:
+                    self.flush()
+                except (OSError, ValueError):
+                    # Raw stream closed at interpreter shutdown
+                    return
+
+
+class _BufferedStreamHandler(logging.StreamHandler):
+    """Stream handler over a _BufStream that only forces a flush for ERROR and above"""
+    
+    def emit(self, record: logging.LogRecord):
+        super().emit(record)
+        if record.levelno >= logging.ERROR:
+            self.stream.flush()
+    
+    def flush(self):
+        # StreamHandler.emit calls this per record; draining is left to the
+        # buffer size, the idle flusher, ERROR records and close()
+        pass
+    
+    def close(self):
+        try:
+            self.stream.flush()
+        finally:
+            super().close()
+
+
+def _stderr_handler(flush_interval_ms: int) -> logging.StreamHandler:
+    """Buffered handler over stderr's byte stream, or a plain one if it has none"""
+    raw = getattr(sys.stderr, "buffer", None)
+    if raw is None:
+        return logging.StreamHandler()
+    encoding = getattr(sys.stderr, "encoding", None) or "utf-8"
+    return _BufferedStreamHandler(_BufStream(raw, encoding, flush_interval_ms=flush_interval_ms))
+
+
 class StructuredLogger:
     """Structured JSON logging with context"""
     
-    def __init__(self, name: str, level: int = logging.INFO):
+    def __init__(
+        self,
+        name: str,
+        level: int = logging.INFO,
+        max_backlog: int = 10000,
+        flush_interval_ms: int = 200
+    ):
         self.logger = logging.getLogger(name)
         self.logger.setLevel(level)
-        
-        handler = logging.StreamHandler()
-        formatter = logging.Formatter('%(message)s')
-        handler.setFormatter(formatter)
+        self._listener: Optional[QueueListener] = None
         
         if not self.logger.handlers:
-            self.logger.addHandler(handler)
+            # Only the listener thread writes to it, so records reach the
+            # buffer already serialized
+            handler = _stderr_handler(flush_interval_ms)
+            formatter = logging.Formatter('%(message)s')
+            handler.setFormatter(formatter)
+            
+            # Callers only enqueue; a listener thread does the stream writes
+            self._queue: queue.SimpleQueue = queue.SimpleQueue()
+            self.logger.addHandler(_BoundedQueueHandler(self._queue, max_backlog))
+            self._listener = QueueListener(self._queue, handler, respect_handler_level=True)
+            self._listener.start()
+            # atexit runs LIFO: stop the listener first, then drain the buffer
+            atexit.register(handler.close)
+            atexit.register(self._listener.stop)
         
-        self.context: Dict[str, Any] = {}
+        # Never mutated once published: changes swap in a new dict, so log calls
+        # read it without the lock, which only orders writers. context is the
+        # read-only public view of it
+        self._context: Dict[str, Any] = {}
+        self.context: Mapping[str, Any] = MappingProxyType(self._context)
         self._lock = threading.Lock()
+        # (context dict, its JSON), reused while that dict is current
+        self._context_cache: Optional[Tuple[Dict[str, Any], str]] = None
     
     def set_context(self, **kwargs):
         """Set logging context"""
         with self._lock:
-            self.context.update(kwargs)
+            self._publish_context({**self._context, **kwargs})
     
     def clear_context(self):
         """Clear logging context"""
         with self._lock:
-            self.context.clear()
+            self._publish_context({})
+    
+    def _publish_context(self, context: Dict[str, Any]):
+        self.context = MappingProxyType(context)
+        self._context = context
     
     def _format_message(self, message: str, **extra) -> str:
-        """Format log message with context"""
-        log_data = {
-            "timestamp": datetime.now().isoformat(),
-            "message": message,
-            "context": self.context.copy()
-        }
-        log_data["context"].update(extra)
-        return json.dumps(log_data)
+        """Format log message with context; never raises"""
+        try:
+            return self._serialize(message, extra)
+        except Exception:
+            pass
+        
+        if ORJSON_AVAILABLE:
+            # orjson rejects some values outright without calling default (e.g.
+            # integers wider than 64 bits) that the stdlib encoder handles
+            try:
+                return _stdlib_dumps({
+                    "timestamp": datetime.now(),
+                    "message": message,
+                    "context": {**self._context, **extra}
+                })
+            except Exception:
+                pass
+        
+        return _dumps({
+                "timestamp": datetime.now(),
+                "message": str(message),
+                "error": "log_serialize_failed"
+            })
+    
+    def _serialize(self, message: str, extra: Dict[str, Any]) -> str:
+        """Serialize message, context and extra fields as one JSON record"""
+        context = self._context
+        # orjson serializes the whole record faster than the cached-context
+        # splice below, which only pays off for the stdlib encoder
+        if extra or ORJSON_AVAILABLE:
+            return _dumps({
+                "timestamp": datetime.now(),
+                "message": message,
+                "context": {**context, **extra}
+            })
+        
+        cached = self._context_cache
+        if cached is None or cached[0] is not context:
+            cached = self._context_cache = (context, _dumps(context))
+        # Same layout _dumps produces for the full record
+        return '{"timestamp":"%s","message":%s,"context":%s}' % (
+            datetime.now().isoformat(), _dumps(message), cached[1]
+        )
     
     def info(self, message: str, **extra):
         self.logger.info(self._format_message(message, **extra))
@@ -79,6 +295,58 @@ class StructuredLogger:
         self.logger.debug(self._format_message(message, **extra))
 
 
+# Parameter count in a model name, e.g. "MEDIUM_7B" or "llama-3-8b-instruct"
+_MODEL_PARAMS_RE = re.compile(r"(\d+(?:\.\d+)?)\s*b\b", re.IGNORECASE)
+
+# Bounded error_type label values; anything else is recorded as "other"
+_ERROR_CATEGORIES = {
+    "TimeoutError": "timeout",
+    "CancelledError": "timeout",
+    "ConnectionError": "connection",
+    "ConnectionRefusedError": "connection",
+    "ConnectionResetError": "connection",
+    "BrokenPipeError": "connection",
+    "ValueError": "validation",
+    "TypeError": "validation",
+    "KeyError": "validation",
+    "ValidationError": "validation",
+    "PermissionError": "auth",
+    "AuthenticationError": "auth",
+    "FileNotFoundError": "io",
+    "OSError": "io",
+    "MemoryError": "resource",
+    "QueueFull": "resource",
+    "OutOfMemoryError": "resource",
+    "RuntimeError": "runtime",
+    "NotImplementedError": "runtime",
+}
+_ERROR_CATEGORY_VALUES = frozenset(_ERROR_CATEGORIES.values()) | {"other"}
+
+# prometheus_client caps an exemplar's label names plus values at 128 characters
+_EXEMPLAR_MODEL_NAME_LEN = 128 - len("model_name")
+
+
+@lru_cache(maxsize=256)
+def _model_class(model_name: str) -> str:
+    """Bucket a model name into small/medium/large by its parameter count"""
+    match = _MODEL_PARAMS_RE.search(model_name)
+    if match is None:
+        return "unknown"
+    params = float(match.group(1))
+    if params <= 3:
+        return "small"
+    if params <= 13:
+        return "medium"
+    return "large"
+
+
+def _error_category(error_type: str) -> str:
+    """Map an exception class name (or a category) onto the bounded label set"""
+    if error_type in _ERROR_CATEGORY_VALUES:
+        return error_type
+    return _ERROR_CATEGORIES.get(error_type, "other")
+
+
 class MetricsCollector:
     """Prometheus metrics collection"""
     
@@ -101,20 +369,20 @@ class MetricsCollector:
             f'{self.service_name}_query_latency_seconds',
             'Query processing latency',
             ['complexity', 'mode'],
-            buckets=[0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+            buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
         )
         
         self.model_load_counter = Counter(
             f'{self.service_name}_model_loads_total',
             'Total model loads',
-            ['model_name', 'status']
+            ['model_class', 'status']
         )
         
         self.model_load_latency = Histogram(
             f'{self.service_name}_model_load_latency_seconds',
             'Model loading latency',
-            ['model_name'],
-            buckets=[0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0]
+            ['model_class'],
+            buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
         )
         
         self.memory_usage = Gauge(
@@ -127,7 +395,7 @@ class MetricsCollector:
             f'{self.service_name}_verification_confidence',
             'Verification confidence scores',
             ['level'],
-            buckets=[0.5, 0.6, 0.7, 0.8, 0.9, 1.0]
+            buckets=(0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
         )
         
         self.routing_decisions = Counter(
@@ -142,55 +410,83 @@ class MetricsCollector:
             ['component', 'error_type']
         )
         
+        self.files_cache_hits = Counter(
+            f'{self.service_name}_files_cache_hits_total',
+            'Parsed file content served from cache'
+        )
+        
+        self.files_cache_misses = Counter(
+            f'{self.service_name}_files_cache_misses_total',
+            'Parsed file content downloaded and parsed'
+        )
+        
+        # Labelled children by (metric, *label values), so each series pays for
+        # prometheus_client's labels() resolution and lock once
+        self._children: Dict[Tuple[Any, ...], Any] = {}
+        
         self._initialized = True
     
+    def _labeled(self, metric: Any, *values: str) -> Any:
+        """Child of metric for label values given in the metric's label order"""
+        key = (metric, *values)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = metric.labels(*values)
+        return child
+    
     def record_query(self, complexity: str, mode: str, status: str, latency: float):
         """Record query metrics"""
         if not self._initialized:
             return
         
-        self.query_counter.labels(complexity=complexity, mode=mode, status=status).inc()
-        self.query_latency.labels(complexity=complexity, mode=mode).observe(latency)
+        self._labeled(self.query_counter, complexity, mode, status).inc()
+        self._labeled(self.query_latency, complexity, mode).observe(latency)
     
     def record_model_load(self, model_name: str, status: str, latency: float):
-        """Record model load metrics"""
+        """Record model load metrics; the exact model name is kept as a latency exemplar"""
         if not self._initialized:
             return
         
-        self.model_load_counter.labels(model_name=model_name, status=status).inc()
-        self.model_load_latency.labels(model_name=model_name).observe(latency)
+        model_class = _model_class(model_name)
+        self._labeled(self.model_load_counter, model_class, status).inc()
+        self._labeled(self.model_load_latency, model_class).observe(
+            latency, {"model_name": model_name[:_EXEMPLAR_MODEL_NAME_LEN]}
+        )
     
     def record_verification(self, level: str, confidence: float):
         """Record verification metrics"""
         if not self._initialized:
             return
         
-        self.verification_confidence.labels(level=level).observe(confidence)
+        self._labeled(self.verification_confidence, level).observe(confidence)
     
     def record_routing_decision(self, complexity: str, model_size: str, execution_mode: str):
         """Record routing decision"""
         if not self._initialized:
             return
         
-        self.routing_decisions.labels(
-            complexity=complexity,
-            model_size=model_size,
-            execution_mode=execution_mode
-        ).inc()
+        self._labeled(self.routing_decisions, complexity, model_size, execution_mode).inc()
+    
+    def record_file_cache(self, hit: bool):
+        """Record a parsed-file cache lookup"""
+        if not self._initialized:
+            return
+        
+        (self.files_cache_hits if hit else self.files_cache_misses).inc()
     
     def record_error(self, component: str, error_type: str):
-        """Record error"""
+        """Record error; error_type is collapsed to a bounded category"""
         if not self._initialized:
             return
         
-        self.error_counter.labels(component=component, error_type=error_type).inc()
+        self._labeled(self.error_counter, component, _error_category(error_type)).inc()
     
     def set_memory_usage(self, component: str, bytes_used: float):
         """Set memory usage gauge"""
         if not self._initialized:
             return
         
-        self.memory_usage.labels(component=component).set(bytes_used)
+        self._labeled(self.memory_usage, component).set(bytes_used)
     
     def start_metrics_server(self, port: int = 9090):
         """Start Prometheus metrics server"""
@@ -202,10 +498,14 @@ class MetricsCollector:
 class DistributedTracer:
     """OpenTelemetry distributed tracing"""
     
-    def __init__(self, service_name: str = "amaima"):
+    def __init__(self, service_name: str = "amaima", sample_ratio: float = 0.1):
         self.service_name = service_name
+        # Fraction of root traces kept; child spans follow their parent's decision
+        self.sample_ratio = sample_ratio
         self.tracer = None
         self.meter = None
+        # Duration histograms by operation name, created on first use
+        self._histograms: Dict[str, Any] = {}
         self._initialized = False
         
         if OPENTELEMETRY_AVAILABLE:
@@ -213,7 +513,23 @@ class DistributedTracer:
     
     def _setup_telemetry(self):
         """Initialize OpenTelemetry"""
-        provider = TracerProvider()
+        provider = TracerProvider(sampler=ParentBasedTraceIdRatio(self.sample_ratio))
+        
+        # Ended spans are queued and exported in batches from a worker thread
+        try:
+            from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+            provider.add_span_processor(BatchSpanProcessor(
+                OTLPSpanExporter(),
+                max_queue_size=10000,
+                max_export_batch_size=5000,
+                schedule_delay_millis=200,
+                export_timeout_millis=2000
+            ))
+        except ImportError:
+            logging.warning("OTLP exporter not available, spans will not be exported")
+        # Flush queued spans on interpreter exit
+        atexit.register(provider.shutdown)
+        
         trace.set_tracer_provider(provider)
         self.tracer = trace.get_tracer(self.service_name)
         
@@ -228,7 +544,7 @@ class DistributedTracer:
         self._initialized = True
     
     @contextmanager
-    def span(self, name: str, attributes: Optional[Dict] = None):
+    def span(self, name: str, attributes: Optional[Mapping[str, Any]] = None):
         """Create a trace span"""
         if not self._initialized or not self.tracer:
             yield None
@@ -240,94 +556,157 @@ class DistributedTracer:
                     span.set_attribute(key, value)
             yield span
     
-    def record_duration(self, name: str, duration_seconds: float, attributes: Optional[Dict] = None):
+    def record_duration(self, name: str, duration_seconds: float, attributes: Optional[Mapping[str, Any]] = None):
         """Record duration metric"""
         if not self._initialized or not self.meter:
             return
         
-        counter = self.meter.create_counter(
-            name=f"{self.service_name}_{name}_duration",
-            description=f"Duration of {name} operations"
-        )
-        counter.add(1, attributes or {})
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            # Milliseconds, the scale of the SDK's default bucket boundaries
+            # (0, 5, 10, ... 10000)
+            histogram = self._histograms.setdefault(name, self.meter.create_histogram(
+                name=f"{self.service_name}_{name}_duration",
+                unit="ms",
+                description=f"Duration of {name} operations"
+            ))
+        histogram.record(duration_seconds * 1000, attributes or _EMPTY_ATTRS)
 
 
 def trace_function(name: Optional[str] = None):
     """Decorator to trace function execution"""
     def decorator(func: Callable) -> Callable:
+        span_name = name or func.__name__
+        # Built once per decorated function rather than on every call
+        span_attrs = MappingProxyType({"function": span_name})
+        success_attrs = MappingProxyType({"status": "success"})
+        
+        # Coroutine functions get an async wrapper so the span and timer cover
+        # the awaited work, not just the creation of the coroutine
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                tracer = get_tracer()
+                with tracer.span(span_name, span_attrs):
+                    start = time.time()
+                    try:
+                        return await func(*args, **kwargs)
+                    finally:
+                        duration = time.time() - start
+                        tracer.record_duration(span_name, duration, success_attrs)
+            
+            return async_wrapper
+        
         @wraps(func)
         def wrapper(*args, **kwargs):
             tracer = get_tracer()
-            span_name = name or func.__name__
             
-            with tracer.span(span_name, {"function": span_name}):
+            with tracer.span(span_name, span_attrs):
                 start = time.time()
                 try:
                     result = func(*args, **kwargs)
                     return result
                 finally:
                     duration = time.time() - start
-                    tracer.record_duration(span_name, duration, {"status": "success"})
+                    tracer.record_duration(span_name, duration, success_attrs)
         
         return wrapper
     return decorator
 
 
+def _order_statistics(values: List[float], ranks: Tuple[int, ...]) -> List[float]:
+    """
+    Values at the given 0-based ranks of values in sorted order
+    
+    Uses numpy's introselect, O(n) for all ranks together, when available;
+    otherwise sorts once.
+    """
+    if NUMPY_AVAILABLE:
+        arr = np.fromiter(values, dtype=np.float64, count=len(values))
+        arr.partition(ranks)
+        return [float(arr[rank]) for rank in ranks]
+    ordered = sorted(values)
+    return [ordered[rank] for rank in ranks]
+
+
 class PerformanceProfiler:
     """Performance profiling utilities"""
     
-    def __init__(self):
-        self.profiles: Dict[str, List[float]] = {}
-        self._lock = threading.Lock()
+    def __init__(self, max_samples: int = 10000):
+        # Most recent durations per operation. deque.append and dict.setdefault
+        # are atomic under the GIL, so recording takes no lock
+        self.profiles: Dict[str, Deque[float]] = {}
+        self.max_samples = max_samples
     
     def profile(self, operation_name: str) -> Callable:
         """Decorator to profile function execution time"""
         def decorator(func: Callable) -> Callable:
+            if inspect.iscoroutinefunction(func):
+                @wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    start = time.perf_counter()
+                    try:
+                        return await func(*args, **kwargs)
+                    finally:
+                        self._record(operation_name, time.perf_counter() - start)
+                
+                return async_wrapper
+            
             @wraps(func)
             def wrapper(*args, **kwargs):
-                start = time.time()
+                start = time.perf_counter()
                 try:
                     return func(*args, **kwargs)
                 finally:
-                    duration = time.time() - start
-                    with self._lock:
-                        if operation_name not in self.profiles:
-                            self.profiles[operation_name] = []
-                        self.profiles[operation_name].append(duration)
+                    self._record(operation_name, time.perf_counter() - start)
             
             return wrapper
         return decorator
     
+    def _record(self, operation_name: str, duration: float):
+        """Append a duration sample for operation_name"""
+        samples = self.profiles.get(operation_name)
+        if samples is None:
+            samples = self.profiles.setdefault(
+                operation_name, deque(maxlen=self.max_samples)
+            )
+        samples.append(duration)
+    
     def get_statistics(self, operation_name: Optional[str] = None) -> Dict[str, Any]:
         """Get profiling statistics"""
-        with self._lock:
-            if operation_name:
-                durations = self.profiles.get(operation_name, [])
-            else:
-                durations = [d for durations in self.profiles.values() for d in durations]
+        # list() copies each deque in one C call, so the snapshot is consistent
+        if operation_name:
+            durations = list(self.profiles.get(operation_name, ()))
+        else:
+            durations = [d for samples in list(self.profiles.values()) for d in list(samples)]
         
         if not durations:
             return {}
         
+        count = len(durations)
+        total = sum(durations)
+        p50, p95, p99 = _order_statistics(
+            durations, (count // 2, int(count * 0.95), int(count * 0.99))
+        )
+        
         return {
             "operation": operation_name or "all",
-            "count": len(durations),
-            "total_seconds": sum(durations),
-            "average_seconds": sum(durations) / len(durations),
+            "count": count,
+            "total_seconds": total,
+            "average_seconds": total / count,
             "min_seconds": min(durations),
             "max_seconds": max(durations),
-            "p50_seconds": sorted(durations)[len(durations) // 2] if durations else 0,
-            "p95_seconds": sorted(durations)[int(len(durations) * 0.95)] if durations else 0,
-            "p99_seconds": sorted(durations)[int(len(durations) * 0.99)] if durations else 0
+            "p50_seconds": p50,
+            "p95_seconds": p95,
+            "p99_seconds": p99
         }
     
     def reset(self, operation_name: Optional[str] = None):
         """Reset profiling data"""
-        with self._lock:
-            if operation_name:
-                self.profiles.pop(operation_name, None)
-            else:
-                self.profiles.clear()
+        if operation_name:
+            self.profiles.pop(operation_name, None)
+        else:
+            self.profiles.clear()
 
 
 _global_logger = None
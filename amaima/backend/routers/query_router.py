@@ -3,9 +3,182 @@
 from fastapi import APIRouter, Depends, UploadFile, File, Form
 from typing import List, Optional
 from pydantic import BaseModel
+from collections import OrderedDict
+import asyncio
+import io
+import logging
+
+from app.modules.observability_framework import get_metrics
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/v1/query", tags=["queries"])
 
+# Query analytics records are queued by submit_query and written in batches
+QUERY_LOG_MAX_PENDING = 10_000
+QUERY_LOG_BATCH_SIZE = 500
+QUERY_LOG_FLUSH_SECONDS = 0.1
+
+# Characters of each attached file's parsed content passed to the model
+MAX_FILE_CONTEXT_CHARS = 200_000
+
+# Parsed file contents by (file_id, version, user_id), least recently used first
+FILE_CACHE_MAX_ENTRIES = 1024
+FILE_CACHE_MAX_CHARS = 64_000_000
+
+_file_cache: "OrderedDict[tuple, str]" = OrderedDict()
+_file_cache_chars = 0
+
+_query_log_queue: Optional[asyncio.Queue] = None
+_query_log_task: Optional[asyncio.Task] = None
+
+# Queued by stop_query_log_writer after the last record
+_STOP_WRITER = object()
+
+
+async def _write_query_logs(records: List[dict]):
+    """Write a batch of query log records concurrently"""
+    results = await asyncio.gather(
+        *(log_query(**record) for record in records), return_exceptions=True
+    )
+    failures = [result for result in results if isinstance(result, Exception)]
+    for failure in failures:
+        if isinstance(failure, (NameError, AttributeError, TypeError)):
+            # A bug in the write path, not a failed write: don't hide it
+            raise failure
+    if failures:
+        logger.error(f"Failed to write {len(failures)} of {len(records)} query log records: {failures[0]}")
+
+
+def _take_pending(queue: asyncio.Queue) -> List[dict]:
+    """Remove and return the records still in queue"""
+    pending = []
+    while not queue.empty():
+        record = queue.get_nowait()
+        if record is not _STOP_WRITER:
+            pending.append(record)
+    return pending
+
+
+async def _query_log_writer(queue: asyncio.Queue):
+    """Drain the query log queue, flushing every QUERY_LOG_BATCH_SIZE records or QUERY_LOG_FLUSH_SECONDS"""
+    loop = asyncio.get_running_loop()
+    stopping = False
+    while not stopping:
+        record = await queue.get()
+        if record is _STOP_WRITER:
+            return
+        batch = [record]
+        deadline = loop.time() + QUERY_LOG_FLUSH_SECONDS
+        
+        while len(batch) < QUERY_LOG_BATCH_SIZE:
+            try:
+                record = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    record = await asyncio.wait_for(queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            if record is _STOP_WRITER:
+                stopping = True
+                break
+            batch.append(record)
+        
+        await _write_query_logs(batch)
+
+
+@router.on_event("startup")
+async def start_query_log_writer():
+    """Start the background query log writer"""
+    global _query_log_queue, _query_log_task
+    _query_log_queue = asyncio.Queue(maxsize=QUERY_LOG_MAX_PENDING)
+    _query_log_task = asyncio.create_task(_query_log_writer(_query_log_queue))
+    _query_log_task.add_done_callback(_log_writer_failure)
+
+
+def _log_writer_failure(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Query log writer stopped: {task.exception()!r}")
+
+
+@router.on_event("shutdown")
+async def stop_query_log_writer():
+    """Stop the writer once it has written every record queued so far"""
+    global _query_log_queue, _query_log_task
+    if _query_log_task is None:
+        return
+    
+    queue, task = _query_log_queue, _query_log_task
+    # Later records are written inline by enqueue_query_log, none land
+    # behind the sentinel
+    _query_log_queue = None
+    _query_log_task = None
+    
+    if not task.done():
+        await queue.put(_STOP_WRITER)
+    else:
+        # The writer failed; write what it left behind before re-raising its error
+        pending = _take_pending(queue)
+        if pending:
+            await _write_query_logs(pending)
+    await task
+
+
+async def get_parsed_file(file_id: str, file_metadata, user_id) -> str:
+    """
+    Parsed content of a file, cached across requests
+    
+    Entries are keyed by the file's etag (or updated_at), so a changed file
+    misses the cache; files exposing neither are never cached.
+    """
+    global _file_cache_chars
+    metrics = get_metrics()
+    version = getattr(file_metadata, "etag", None) or getattr(file_metadata, "updated_at", None)
+    if version is None:
+        return await download_and_parse_file(file_metadata)
+    
+    key = (file_id, version, user_id)
+    content = _file_cache.get(key)
+    if content is not None:
+        _file_cache.move_to_end(key)
+        metrics.record_file_cache(hit=True)
+        return content
+    
+    metrics.record_file_cache(hit=False)
+    content = await download_and_parse_file(file_metadata)
+    
+    # A concurrent fetch of the same file may have filled the entry meanwhile
+    if key not in _file_cache:
+        _file_cache[key] = content
+        _file_cache_chars += len(content)
+        while _file_cache and (len(_file_cache) > FILE_CACHE_MAX_ENTRIES
+                               or _file_cache_chars > FILE_CACHE_MAX_CHARS):
+            _, evicted = _file_cache.popitem(last=False)
+            _file_cache_chars -= len(evicted)
+    return content
+
+
+async def enqueue_query_log(**record):
+    """Queue a query log record; drops it when the writer is QUERY_LOG_MAX_PENDING behind"""
+    if _query_log_queue is None:
+        # Writer not running (no startup event), write inline
+        await log_query(**record)
+        return
+    
+    if _query_log_task.done():
+        # Writer failed: nothing drains the queue any more, so write inline,
+        # taking along whatever it left behind
+        await _write_query_logs(_take_pending(_query_log_queue) + [record])
+        return
+    
+    try:
+        _query_log_queue.put_nowait(record)
+    except asyncio.QueueFull:
+        get_metrics().record_error("query_log", "QueueFull")
+
 class QueryRequest(BaseModel):
     query: str
     operation: str = "general"
@@ -33,8 +206,9 @@ async def submit_query(
     
     # Process file attachments
     file_contents = []
+    file_refs = []
     if request.file_ids:
-        for file_id in request.file_ids:
+        async def fetch_file(file_id: str):
             file_metadata = await get_file_metadata(file_id, current_user.id)
             
             if not file_metadata:
@@ -45,7 +219,18 @@ async def submit_query(
                 )
             
             # Download and parse file content
-            file_content = await download_and_parse_file(file_metadata)
+            return file_metadata, await get_parsed_file(file_id, file_metadata, current_user.id)
+        
+        # Fetch all attachments concurrently; if one fails, cancel the rest
+        tasks = [asyncio.ensure_future(fetch_file(file_id)) for file_id in request.file_ids]
+        try:
+            fetched = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        
+        for file_id, (file_metadata, file_content) in zip(request.file_ids, fetched):
             file_contents.append({
                 "filename": file_metadata.filename,
                 "content": file_content,
@@ -53,19 +238,30 @@ async def submit_query(
             })
             
             # Add file reference to response
-            context.setdefault("file_references", []).append({
+            file_refs.append({
                 "file_id": file_id,
                 "filename": file_metadata.filename
             })
+        
+        if file_refs:
+            context["file_references"] = file_refs
     
     # Enhance query with file contents
     enhanced_query = request.query
     if file_contents:
-        file_context = "\n\n".join([
-            f"--- File: {f['filename']} ---\n{f['content']}"
-            for f in file_contents
-        ])
-        enhanced_query = f"{request.query}\n\nRelevant file contents:\n{file_context}"
+        # One buffer for the whole prompt, so the file sections are not joined
+        # into an intermediate string and then copied again
+        buf = io.StringIO()
+        buf.write(request.query)
+        buf.write("\n\nRelevant file contents:\n")
+        for i, f in enumerate(file_contents):
+            if i:
+                buf.write("\n\n")
+            buf.write("--- File: ")
+            buf.write(f["filename"])
+            buf.write(" ---\n")
+            buf.write(f["content"][:MAX_FILE_CONTEXT_CHARS])
+        enhanced_query = buf.getvalue()
     
     # Route query through smart router
     routing_decision = await smart_router.route(
@@ -78,13 +274,13 @@ async def submit_query(
     )
     
     # Process query with selected model
-    start_time = time.time()
+    start_time = time.perf_counter()
     response_text = await process_query_with_model(
         enhanced_query,
         routing_decision.model_name,
         context=context
     )
-    latency_ms = int((time.time() - start_time) * 1000)
+    latency_ms = int((time.perf_counter() - start_time) * 1000)
     
     # Verify response quality
     verification = await verify_response(
@@ -94,7 +290,7 @@ async def submit_query(
     )
     
     # Log query for analytics
-    await log_query(
+    await enqueue_query_log(
         user_id=current_user.id,
         query=request.query,
         response=response_text,
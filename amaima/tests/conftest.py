@@ -1,35 +1,73 @@
 # tests/conftest.py
 
+import sys
 import pytest
 import asyncio
+from pathlib import Path
 from httpx import AsyncClient, ASGITransport
 from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
+from sqlalchemy.pool import StaticPool
 
-from app.main import app
-from app.db.database import get_db
-from app.auth.jwt import create_access_token
-from app.models.user import User
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# Tests import the backend's app package wherever pytest is started from
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+try:
+    from app.main import app
+    from app.db.database import get_db
+    from app.auth.jwt import create_access_token
+    from app.models.user import User
+except ImportError:
+    # API layer not available: only tests that skip the client fixtures can run
+    app = get_db = create_access_token = User = None
 
 @pytest.fixture(scope="session")
 def event_loop():
-    """Create event loop for async tests"""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
+    """Create event loop for async tests, on uvloop where it is installed"""
+    policy = uvloop.EventLoopPolicy() if uvloop is not None else asyncio.get_event_loop_policy()
+    loop = policy.new_event_loop()
     yield loop
     loop.close()
 
-@pytest.fixture
-async def db_session():
-    """Create database session for testing"""
-    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+@pytest.fixture(scope="session")
+async def db_engine() -> AsyncGenerator[AsyncEngine, None]:
+    """Create the in-memory database and its schema once per test session"""
+    # StaticPool keeps the single connection that holds the :memory: database
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    
+    # Let SQLAlchemy emit BEGIN itself so SAVEPOINTs work with the sqlite driver
+    @event.listens_for(engine.sync_engine, "connect")
+    def _disable_driver_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+    
+    @event.listens_for(engine.sync_engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN")
+    
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
-    
-    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-    async with async_session() as session:
-        yield session
-        await session.rollback()
+    yield engine
+    await engine.dispose()
+
+@pytest.fixture
+async def db_session(db_engine: AsyncEngine) -> AsyncGenerator[AsyncSession, None]:
+    """Create database session for testing, rolled back after each test"""
+    async with db_engine.connect() as conn:
+        trans = await conn.begin()
+        # Session commits release a SAVEPOINT; the outer transaction is never committed
+        async with AsyncSession(
+            bind=conn,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint"
+        ) as session:
+            yield session
+        await trans.rollback()
 
 @pytest.fixture
 async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
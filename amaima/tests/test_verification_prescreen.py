@@ -0,0 +1,50 @@
+# tests/test_verification_prescreen.py
+
+import importlib.util
+
+import pytest
+
+from app.modules.multi_layer_verification_engine import PlausibilityChecker, SecurityScanner
+
+requires_hyperscan = pytest.mark.skipif(
+    importlib.util.find_spec("hyperscan") is None, reason="hyperscan not installed"
+)
+
+# \x1c-\x1f are whitespace to re's Unicode \s but not to hyperscan's
+SAMPLES = [
+    'import\x1cos\nyaml.load\x1c(d)\neval\x1f("1")',
+    'import os\nyaml.load(d)\neval("1")',
+    "The answer is 42 and the study proves it.",
+]
+
+
+@requires_hyperscan
+@pytest.mark.parametrize("text", SAMPLES)
+def test_plausibility_prescreen_matches_re(text):
+    """Hyperscan pre-screening finds the same code safety issues as re alone"""
+    screened = PlausibilityChecker()
+    assert screened._prescreen is not None
+    
+    unscreened = PlausibilityChecker()
+    unscreened._prescreen = None
+    
+    assert screened.check(text) == unscreened.check(text)
+
+
+@requires_hyperscan
+@pytest.mark.parametrize("text", SAMPLES)
+def test_security_fallback_prescreen_matches_re(text):
+    """Hyperscan pre-screening finds the same fallback vulnerabilities as re alone"""
+    screened = SecurityScanner()
+    assert screened._prescreen is not None
+    
+    unscreened = SecurityScanner()
+    unscreened._prescreen = None
+    
+    assert screened._fallback_scan(text) == unscreened._fallback_scan(text)
+
+
+def test_security_fallback_flags_control_separated_calls():
+    """\x1c-\x1f count as whitespace between a call and its parenthesis"""
+    found = {v["type"] for v in SecurityScanner()._fallback_scan(SAMPLES[0])}
+    assert found == {"Code injection via eval", "YAML deserialization vulnerability"}